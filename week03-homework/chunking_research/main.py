@@ -1,16 +1,41 @@
+import io
 import os
+import mmap
+import sys
+import json
+import pickle
 import time
-from typing import List, Dict, Any
+import random
+import gc
+import asyncio
+import atexit
+import shelve
+import hashlib
+import importlib.util
+import threading
+import httpx
+import numpy as np
+import tiktoken
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Dict, Any, Tuple, Optional
 from dotenv import load_dotenv
 
 # LlamaIndex 核心组件
 from llama_index.core import Settings, VectorStoreIndex, SimpleDirectoryReader, Document
-from llama_index.core.node_parser import SentenceSplitter, TokenTextSplitter, SentenceWindowNodeParser
-from llama_index.core.schema import TextNode
+from llama_index.core import StorageContext, load_index_from_storage
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+from llama_index.core.node_parser import SentenceSplitter, SentenceWindowNodeParser
+from llama_index.core.readers.base import BaseReader
+from llama_index.core.schema import TextNode, NodeRelationship
+from llama_index.core.vector_stores import SimpleVectorStore
+from llama_index.core.vector_stores.types import VectorStoreQuery, VectorStoreQueryResult, VectorStoreQueryMode
+from llama_index.core.vector_stores.utils import node_to_metadata_dict, build_metadata_filter_fn
 from llama_index.core.postprocessor import MetadataReplacementPostProcessor
+from llama_index.core.utils import get_tokenizer
 
-# LLM 和 Embedding 模型
-from llama_index.llms.openai_like import OpenAILike
+# Embedding 模型（评估只做检索，不需要 LLM）
 from llama_index.embeddings.dashscope import DashScopeEmbedding, DashScopeTextEmbeddingModels
 
 
@@ -18,33 +43,283 @@ from llama_index.embeddings.dashscope import DashScopeEmbedding, DashScopeTextEm
 # 1. 加载环境变量和初始化全局配置
 load_dotenv()
 
+# 测试文档目录
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
 
-# 配置 LLM（大语言模型）- 使用阿里云通义千问
-Settings.llm = OpenAILike(
-    model="qwen-plus",  # 使用通义千问 Plus 模型
-    api_base="https://dashscope.aliyuncs.com/compatible-mode/v1/",
-    api_key=os.getenv("DASHSCOPE_API_KEY"),
-    is_chat_model=True  # 指定为对话模型
-)
+# 缓存目录（Embedding 缓存等都放在这里，可以随时删除）
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+CORPUS_STATE_PATH = os.path.join(CACHE_DIR, "corpus_state.json")
+RESULTS_CACHE_PATH = os.path.join(CACHE_DIR, "all_results.pkl")
+
+# 评估流水线参数（见 arun_sweep_pipeline）
+# 建索引和检索 worker 的数量同时也限制了对 DashScope 的并发请求，避免触发限流
+NUM_INDEX_WORKERS = 4
+NUM_QUERY_WORKERS = 4
+PIPELINE_QUEUE_SIZE = 4  # 阶段之间队列的容量，提供背压
+
+# DashScope 文本 Embedding 接口（见 PooledDashScopeEmbedding）
+DASHSCOPE_EMBEDDING_URL = "https://dashscope.aliyuncs.com/api/v1/services/embeddings/text-embedding/text-embedding"
+
+
+class CachedEmbedding(BaseEmbedding):
+    """
+    带磁盘缓存的 Embedding 包装器
+
+    15 组配置会对大量相同的文本块反复调用 DashScope，这里以
+    SHA256(模型名 + 文本) 为键把向量持久化到 shelve 文件中，
+    只有缓存未命中的文本才会真正发起 API 请求。
+    
+    磁盘缓存之前还有一层进程内字典缓存，同一次运行中不同配置切出的
+    相同文本块直接复用向量；同一批次内的重复文本也只请求一次。
+    
+    查询向量另外缓存在内存中：所有配置使用同一个测试问题，
+    只需要向 API 请求一次。
+    """
+
+    cache_path: str = Field(description="shelve 缓存文件路径")
+
+    _embed_model: BaseEmbedding = PrivateAttr()
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _memory_cache: Dict[str, List[float]] = PrivateAttr(default_factory=dict)
+    _query_cache: Dict[str, List[float]] = PrivateAttr(default_factory=dict)
+
+    def __init__(self, embed_model: BaseEmbedding, cache_path: str, **kwargs: Any) -> None:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        super().__init__(
+            model_name=embed_model.model_name,
+            embed_batch_size=embed_model.embed_batch_size,
+            cache_path=cache_path,
+            **kwargs
+        )
+        self._embed_model = embed_model
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "CachedEmbedding"
+
+    def _cache_key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\n{text}".encode("utf-8")).hexdigest()
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._cache_key(text) for text in texts]
+
+        # 1. 进程内缓存
+        embeddings = [self._memory_cache.get(key) for key in keys]
+
+        # 2. 磁盘缓存
+        if any(embedding is None for embedding in embeddings):
+            with self._lock, shelve.open(self.cache_path) as cache:
+                for i, key in enumerate(keys):
+                    if embeddings[i] is None and key in cache:
+                        embeddings[i] = self._memory_cache[key] = cache[key]
+
+        # 3. 只把去重后的未命中文本作为一个批次发给底层模型
+        misses: Dict[str, str] = {}
+        for key, text, embedding in zip(keys, texts, embeddings):
+            if embedding is None:
+                misses.setdefault(key, text)
+        if misses:
+            new_embeddings = dict(zip(
+                misses, self._embed_model._get_text_embeddings(list(misses.values()))
+            ))
+            with self._lock, shelve.open(self.cache_path) as cache:
+                for key, embedding in new_embeddings.items():
+                    cache[key] = embedding
+            self._memory_cache.update(new_embeddings)
+            embeddings = [
+                new_embeddings[key] if embedding is None else embedding
+                for key, embedding in zip(keys, embeddings)
+            ]
+
+        return embeddings
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._get_text_embeddings([text])[0]
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        if query not in self._query_cache:
+            self._query_cache[query] = self._embed_model._get_query_embedding(query)
+        return self._query_cache[query]
+
+    async def _aget_text_embedding(self, text: str) -> List[float]:
+        return self._get_text_embedding(text)
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        if query not in self._query_cache:
+            self._query_cache[query] = await self._embed_model._aget_query_embedding(query)
+        return self._query_cache[query]
+
+class PooledDashScopeEmbedding(DashScopeEmbedding):
+    """
+    复用 HTTP 连接的 DashScope Embedding
+    
+    DashScope SDK 每次调用都可能重新建立 TLS 连接；这里直接调用
+    text-embedding 接口，所有请求共用一个带连接池和 keepalive 的 httpx.Client，
+    握手开销只在建立连接时付出一次。安装了 h2 时使用 HTTP/2。
+    """
 
-# 配置 Embedding 模型（文本嵌入模型）- 用于将文本转换为向量
-Settings.embed_model = DashScopeEmbedding(
-    model=DashScopeTextEmbeddingModels.TEXT_EMBEDDING_V3,  # 使用 V3 版本的嵌入模型
-    embed_batch_size=6,  # 批处理大小，每次处理 6 个文本
-    embed_input_length=8192  # 最大输入长度为 8192 tokens
+    _client: httpx.Client = PrivateAttr()
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self._client = httpx.Client(
+            http2=importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=32),
+            timeout=60.0,
+        )
+        atexit.register(self._client.close)
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "PooledDashScopeEmbedding"
+
+    def _embed(self, texts: List[str], text_type: str) -> List[List[float]]:
+        """调用 DashScope text-embedding 接口，返回与 texts 顺序一致的向量"""
+        response = self._client.post(
+            DASHSCOPE_EMBEDDING_URL,
+            headers={"Authorization": f"Bearer {self._api_key or os.getenv('DASHSCOPE_API_KEY')}"},
+            json={
+                "model": self.model_name,
+                "input": {"texts": texts},
+                "parameters": {"text_type": text_type},
+            },
+        )
+        if response.status_code != 200:
+            # 网关错误（502/504 等）返回的可能是 HTML 或纯文本，不能假定响应体是 JSON
+            try:
+                body = response.json()
+                detail = f"{body.get('code')}: {body.get('message')}"
+            except (ValueError, AttributeError):
+                detail = response.text
+            raise ValueError(f"DashScope Embedding 请求失败: HTTP {response.status_code} {detail}")
+        body = response.json()
+        embeddings = sorted(body["output"]["embeddings"], key=lambda e: e["text_index"])
+        return [e["embedding"] for e in embeddings]
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        return self._embed([query], "query")[0]
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._embed([text], self._text_type)[0]
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return self._embed(texts, self._text_type)
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        return await asyncio.to_thread(self._get_query_embedding, query)
+
+    async def _aget_text_embedding(self, text: str) -> List[float]:
+        return await asyncio.to_thread(self._get_text_embedding, text)
+
+
+def build_embed_model() -> BaseEmbedding:
+    """
+    创建 Embedding 模型（文本嵌入模型）- 用于将文本转换为向量
+    
+    默认使用 DashScope。如果设置了 LOCAL_EMBED_API_BASE，则改用本地部署的
+    OpenAI 兼容 Embedding 服务（如 infinity 或 HuggingFace TEI），参数扫描时
+    不再受网络延迟和 API 限流的影响，例如：
+    
+        docker run -p 7997:7997 michaelfeil/infinity:latest v2 \\
+            --model-id BAAI/bge-large-zh-v1.5 --batch-size 64
+        LOCAL_EMBED_API_BASE=http://localhost:7997/v1
+    
+    注意：切换模型后向量维度会改变，缓存按模型名区分，不会混用。
+    """
+    local_api_base = os.getenv("LOCAL_EMBED_API_BASE")
+    if local_api_base:
+        try:
+            from llama_index.embeddings.openai_like import OpenAILikeEmbedding
+        except ImportError as e:
+            raise ImportError(
+                "使用本地 Embedding 服务需要安装 llama-index-embeddings-openai-like: "
+                "uv add llama-index-embeddings-openai-like"
+            ) from e
+        return OpenAILikeEmbedding(
+            model_name=os.getenv("LOCAL_EMBED_MODEL", "BAAI/bge-large-zh-v1.5"),
+            api_base=local_api_base,
+            api_key=os.getenv("LOCAL_EMBED_API_KEY", "EMPTY"),
+            embed_batch_size=64  # 本地服务支持动态批处理，可以使用更大的批次
+        )
+    
+    # 所有请求共用一个连接池（见 PooledDashScopeEmbedding）
+    return PooledDashScopeEmbedding(
+        model_name=DashScopeTextEmbeddingModels.TEXT_EMBEDDING_V3,  # 使用 V3 版本的嵌入模型
+        embed_batch_size=10,  # 批处理大小，text-embedding-v3 单次请求最多支持 10 条文本
+        embed_input_length=8192  # 最大输入长度为 8192 tokens
+    )
+
+
+# 配置 Embedding 模型，并用磁盘缓存包装，重复出现的文本块不再重复请求
+Settings.embed_model = CachedEmbedding(
+    build_embed_model(),
+    cache_path=os.path.join(CACHE_DIR, "embed_cache")
 )
 
+# 所有切片器共用的分词器
+# 各配置切分的是同一批文档，大量句子/片段会被重复分词；
+# 这里缓存分词结果，同样的文本在所有配置中只编码一次
+_base_tokenizer = get_tokenizer()
+
+
+@lru_cache(maxsize=65536)
+def shared_tokenizer(text: str) -> Tuple[int, ...]:
+    """带缓存的共享分词器（切片器只使用返回结果的长度）"""
+    return tuple(_base_tokenizer(text))
+
+
 # 配置文本切片器（用于 SentenceWindowNodeParser）
 # 这个设置会被 SentenceWindowNodeParser 内部使用来分割文本
 Settings.text_splitter = SentenceSplitter(
     chunk_size=1024,  # 基础分句器的块大小
-    chunk_overlap=20  # 基础分句器的重叠大小
+    chunk_overlap=20,  # 基础分句器的重叠大小
+    tokenizer=shared_tokenizer
 )
 
 
 # ============================================================
 # 2. 从文件加载测试文档
 # ============================================================
+# 文件数达到该阈值才启用多进程加载；
+# SimpleDirectoryReader 使用 spawn 进程池，子进程要重新导入本模块，文件少时反而更慢
+PARALLEL_LOAD_MIN_FILES = 8
+MAX_LOAD_WORKERS = 8
+
+
+class MmapTextReader(BaseReader):
+    """
+    使用 mmap 读取 .txt 文件的读取器
+    
+    文件内容映射到内存后直接从映射区解码为字符串，
+    不会先把整个文件读成一份 bytes 再复制一次。
+    """
+
+    def load_data(
+        self,
+        file: Path,
+        extra_info: Optional[Dict] = None,
+        **kwargs: Any
+    ) -> List[Document]:
+        """
+        读取单个文本文件
+        
+        Args:
+            file: 文件路径
+            extra_info: SimpleDirectoryReader 生成的文件元数据
+        
+        Returns:
+            只包含一个 Document 的列表
+        """
+        with open(file, "rb") as f:
+            # 空文件无法建立映射
+            if os.fstat(f.fileno()).st_size == 0:
+                text = ""
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    text = str(mm, "utf-8", "ignore")
+        return [Document(text=text, metadata=extra_info or {})]
+
+
 def load_documents_from_data_folder() -> List[Document]:
     """
     从 data 文件夹加载测试文档
@@ -58,11 +333,8 @@ def load_documents_from_data_folder() -> List[Document]:
     Raises:
         ValueError: 如果 data 文件夹不存在或为空
     """
-    # 获取当前脚本所在目录
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    
-    # 构建 data 文件夹的绝对路径
-    data_dir = os.path.join(current_dir, "data")
+    # data 文件夹的绝对路径
+    data_dir = DATA_DIR
     
     # 检查 data 文件夹是否存在
     if not os.path.exists(data_dir):
@@ -79,11 +351,15 @@ def load_documents_from_data_folder() -> List[Document]:
     reader = SimpleDirectoryReader(
         input_dir=data_dir,
         recursive=True,  # 递归读取子文件夹
-        required_exts=[".txt"]  # 只读取 .txt 文件，可以根据需要修改
+        required_exts=[".txt"],  # 只读取 .txt 文件，可以根据需要修改
+        file_extractor={".txt": MmapTextReader()}  # 用 mmap 读取文本文件
     )
     
-    # 加载所有文档
-    documents = reader.load_data()
+    # 加载所有文档（文件较多时并行加载）
+    num_workers = None
+    if len(reader.input_files) >= PARALLEL_LOAD_MIN_FILES:
+        num_workers = min(MAX_LOAD_WORKERS, os.cpu_count() or 1)
+    documents = reader.load_data(num_workers=num_workers, show_progress=num_workers is not None)
     
     # 打印文档信息
     print(f"✓ 成功加载 {len(documents)} 个文档")
@@ -103,83 +379,438 @@ def load_documents_from_data_folder() -> List[Document]:
     return documents
 
 
+# ============================================================
+# 2.1 切片配置的缓存键
+# ============================================================
+# 键为 (切片器类型, chunk_size, chunk_overlap, 分隔符, 文档内容哈希)，
+# 用作磁盘索引缓存的键（见 load_or_build_index）；每个配置在一次运行中只切分一次，
+# 切分结果不在内存中缓存
+def _documents_hash(documents: List[Document]) -> str:
+    """计算文档列表内容的哈希值"""
+    digest = hashlib.sha256()
+    for doc in documents:
+        digest.update(doc.text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _splitter_cache_key(splitter, documents: List[Document]) -> tuple:
+    """生成 (切片器配置, 文档内容) 对应的缓存键"""
+    return (
+        type(splitter).__name__,
+        getattr(splitter, "chunk_size", None),
+        getattr(splitter, "chunk_overlap", None),
+        getattr(splitter, "separator", None),
+        getattr(splitter, "paragraph_separator", None),
+        _documents_hash(documents),
+    )
+
+
+class StageTimer:
+    """
+    记录一个阶段耗时的上下文管理器（基于 time.perf_counter_ns，单位毫秒）
+    
+    用法:
+        with StageTimer() as t:
+            ...
+        print(t.elapsed_ms)
+    """
+
+    def __enter__(self) -> "StageTimer":
+        self.elapsed_ms = 0.0
+        self._start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.elapsed_ms = (time.perf_counter_ns() - self._start_ns) / 1e6
+
+
+def _timing_results(timings: Dict[str, float], query_time: float) -> Dict[str, float]:
+    """汇总各阶段耗时（毫秒），total_time 为三个阶段之和"""
+    return {
+        "split_time": timings["split_time"],
+        "embed_time": timings["embed_time"],
+        "query_time": query_time,
+        "total_time": timings["split_time"] + timings["embed_time"] + query_time,
+    }
+
+
+def _format_timings(results: Dict[str, Any]) -> str:
+    """格式化各阶段耗时，用于单个配置的输出"""
+    return (f"切片 {results['split_time']:.1f} ms / 建索引 {results['embed_time']:.1f} ms / "
+            f"检索 {results['query_time']:.1f} ms（合计 {results['total_time'] / 1000:.2f} 秒）")
+
+
+def _flush_output(out: io.StringIO) -> None:
+    """将缓冲区中的输出一次性写入标准输出"""
+    sys.stdout.write(out.getvalue())
+    sys.stdout.flush()
+
+
+def _mean_score(source_nodes: list) -> float:
+    """计算检索结果的平均相似度分数"""
+    scores = np.fromiter((node.score for node in source_nodes), dtype=np.float32, count=len(source_nodes))
+    return float(scores.mean()) if scores.size else 0.0
+
+
+def _sort_nodes_by_length(nodes: list) -> list:
+    """
+    按文本长度降序排列节点
+    
+    让同一批次内的文本长度相近，每次 Embedding 请求的负载更均匀；
+    索引中节点的顺序不影响检索结果。
+    """
+    return sorted(nodes, key=lambda node: len(node.text), reverse=True)
+
+
+def load_or_build_index(nodes: list, cache_key: tuple) -> VectorStoreIndex:
+    """
+    从磁盘加载已持久化的向量索引，不存在时构建并持久化
+    
+    索引目录由 (切片器配置, 文档内容, Embedding 模型) 的哈希决定，
+    配置和文档都没有变化时，再次运行可以完全跳过 Embedding 请求。
+    
+    Args:
+        nodes: 切片得到的节点列表（缓存未命中时用于构建索引）
+        cache_key: 切片器配置和文档内容对应的缓存键
+    
+    Returns:
+        向量索引
+    """
+    key_json = json.dumps(
+        {"key": cache_key, "embed_model": Settings.embed_model.model_name, "vector_store": "int8"},
+        ensure_ascii=False
+    )
+    config_hash = hashlib.md5(key_json.encode("utf-8")).hexdigest()
+    persist_dir = os.path.join(CACHE_DIR, "indexes", config_hash)
+    
+    if os.path.isdir(persist_dir):
+        try:
+            storage_context = StorageContext.from_defaults(
+                persist_dir=persist_dir,
+                vector_store=QuantizedVectorStore.from_persist_dir(persist_dir)
+            )
+            return load_index_from_storage(storage_context)
+        except Exception as e:
+            # 缓存损坏（例如上次运行中途退出）时重新构建
+            print(f"⚠️  索引缓存加载失败，重新构建: {e}")
+    
+    # 向量以 int8 存储（见 QuantizedVectorStore）
+    storage_context = StorageContext.from_defaults(vector_store=QuantizedVectorStore())
+    index = VectorStoreIndex(_sort_nodes_by_length(nodes), storage_context=storage_context)
+    storage_context.persist(persist_dir=persist_dir)
+    return index
+
+
+# ============================================================
+# 2.2 基于 NumPy 的 Token 切片
+# ============================================================
+# 与 get_tokenizer() 使用同一套 BPE 编码（cl100k_base），token 数与其他切片器一致
+_token_encoding = tiktoken.get_encoding("cl100k_base")
+
+# 每篇文档的 token id 数组，键为文档哈希；所有 Token 切片配置共享
+_doc_token_ids: Dict[str, np.ndarray] = {}
+
+
+def _encode_document(doc: Document) -> np.ndarray:
+    """将文档编码为 int32 token id 数组（每篇文档只编码一次）"""
+    if doc.hash not in _doc_token_ids:
+        _doc_token_ids[doc.hash] = np.asarray(
+            _token_encoding.encode(doc.text, allowed_special="all"), dtype=np.int32
+        )
+    return _doc_token_ids[doc.hash]
+
+
+class NumpyTokenSplitter:
+    """
+    按固定 token 数切分文档的切片器
+    
+    TokenTextSplitter 每个配置都会重新对全文分词、再在 Python 层合并片段；
+    这里每篇文档只编码一次，之后按 step = chunk_size - chunk_overlap
+    直接对 token 数组做切片，只解码切出来的块。
+    
+    注意：与 TokenTextSplitter 不同，块大小不扣除元数据占用的 token 数，
+    也不会回退到按分隔符切分。
+    """
+
+    def __init__(self, chunk_size: int, chunk_overlap: int = 0):
+        if chunk_overlap >= chunk_size:
+            raise ValueError(
+                f"chunk_overlap ({chunk_overlap}) 必须小于 chunk_size ({chunk_size})"
+            )
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+
+    def _split_tokens(self, tokens: np.ndarray) -> List[str]:
+        """对 token 数组切片并解码"""
+        step = self.chunk_size - self.chunk_overlap
+        stop = max(len(tokens) - self.chunk_overlap, 1)
+        # 块边界可能落在一个多字节字符中间，残缺的字节直接丢弃（重叠区域或相邻块中仍有该字符）
+        return [
+            _token_encoding.decode_bytes(tokens[i:i + self.chunk_size].tolist()).decode("utf-8", errors="ignore")
+            for i in range(0, stop, step)
+        ]
+
+    def get_nodes_from_documents(self, documents: List[Document]) -> List[TextNode]:
+        """
+        将文档切分为文本块节点
+        
+        Args:
+            documents: 要切分的文档列表
+        
+        Returns:
+            TextNode 列表，保留原文档的元数据和来源关系
+        """
+        nodes = []
+        for doc in documents:
+            tokens = _encode_document(doc)
+            if tokens.size == 0:
+                continue
+            for text in self._split_tokens(tokens):
+                if not text.strip():
+                    continue
+                nodes.append(TextNode(
+                    text=text,
+                    metadata=dict(doc.metadata),
+                    excluded_embed_metadata_keys=list(doc.excluded_embed_metadata_keys),
+                    excluded_llm_metadata_keys=list(doc.excluded_llm_metadata_keys),
+                    relationships={NodeRelationship.SOURCE: doc.as_related_node_info()},
+                ))
+        return nodes
+
+
+# ============================================================
+# 2.3 int8 量化向量存储
+# ============================================================
+class QuantizedVectorStore(SimpleVectorStore):
+    """
+    以 int8 存储向量的内存向量存储
+    
+    每个向量按自身的最大绝对值缩放到 [-127, 127] 后存为 int8，
+    同时保存缩放系数和反量化后的向量范数，内存占用约为 float32 的 1/4。
+    查询向量保持 float32（非对称量化），余弦相似度为
+        (codes @ q) * scale / (norm * |q|)
+    
+    只支持默认的相似度检索模式；元数据过滤和 node_ids 限定与 SimpleVectorStore 一致。
+    向量持久化到与 JSON 文件同名的 .npz 文件中，JSON 中只保存元数据。
+    """
+
+    _ids: List[str] = PrivateAttr(default_factory=list)
+    _codes: np.ndarray = PrivateAttr(default=None)
+    _scales: np.ndarray = PrivateAttr(default=None)
+    _norms: np.ndarray = PrivateAttr(default=None)
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "QuantizedVectorStore"
+
+    @staticmethod
+    def _quantize(embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """将 float32 向量矩阵量化为 (int8 编码, 缩放系数, 反量化向量的范数)"""
+        scales = np.abs(embeddings).max(axis=1) / 127
+        scales[scales == 0] = 1.0
+        codes = np.rint(embeddings / scales[:, None]).astype(np.int8)
+        norms = np.linalg.norm(codes.astype(np.float32), axis=1) * scales
+        return codes, scales.astype(np.float32), norms.astype(np.float32)
+
+    def _set_vectors(self, ids: List[str], codes: np.ndarray, scales: np.ndarray, norms: np.ndarray) -> None:
+        self._ids, self._codes, self._scales, self._norms = ids, codes, scales, norms
+
+    def _keep_rows(self, keep: np.ndarray) -> None:
+        """只保留 keep 掩码为 True 的向量"""
+        self._set_vectors(
+            [node_id for node_id, k in zip(self._ids, keep) if k],
+            self._codes[keep], self._scales[keep], self._norms[keep]
+        )
+
+    def _filter_rows(self, node_ids: Optional[List[str]], filters) -> np.ndarray:
+        """返回满足 node_ids 限定和元数据过滤条件的行号"""
+        filter_fn = build_metadata_filter_fn(lambda node_id: self.data.metadata_dict[node_id], filters)
+        allowed = set(node_ids) if node_ids is not None else None
+        return np.array([
+            i for i, node_id in enumerate(self._ids)
+            if (allowed is None or node_id in allowed) and filter_fn(node_id)
+        ], dtype=np.intp)
+
+    def get(self, text_id: str) -> List[float]:
+        """获取反量化后的向量"""
+        row = self._ids.index(text_id)
+        return (self._codes[row].astype(np.float32) * self._scales[row]).tolist()
+
+    def add(self, nodes: list, **add_kwargs: Any) -> List[str]:
+        """量化节点向量并加入存储"""
+        if not nodes:
+            return []
+        ids = [node.node_id for node in nodes]
+        codes, scales, norms = self._quantize(
+            np.asarray([node.get_embedding() for node in nodes], dtype=np.float32)
+        )
+        if self._codes is not None:
+            codes = np.concatenate([self._codes, codes])
+            scales = np.concatenate([self._scales, scales])
+            norms = np.concatenate([self._norms, norms])
+        self._set_vectors(self._ids + ids, codes, scales, norms)
+        
+        for node in nodes:
+            self.data.text_id_to_ref_doc_id[node.node_id] = node.ref_doc_id or "None"
+            metadata = node_to_metadata_dict(node, remove_text=True, flat_metadata=False)
+            metadata.pop("_node_content", None)
+            self.data.metadata_dict[node.node_id] = metadata
+        return ids
+
+    def delete(self, ref_doc_id: str, **delete_kwargs: Any) -> None:
+        """删除属于指定文档的所有向量"""
+        # 不能调用 SimpleVectorStore.delete：它会删除 embedding_dict 中的条目，而这里向量不存放在其中
+        text_ids = {
+            text_id for text_id, doc_id in self.data.text_id_to_ref_doc_id.items()
+            if doc_id == ref_doc_id
+        }
+        for text_id in text_ids:
+            del self.data.text_id_to_ref_doc_id[text_id]
+            self.data.metadata_dict.pop(text_id, None)
+        if self._codes is not None and text_ids:
+            self._keep_rows(np.array([node_id not in text_ids for node_id in self._ids], dtype=bool))
+
+    def delete_nodes(self, node_ids: Optional[List[str]] = None, filters=None, **delete_kwargs: Any) -> None:
+        """按节点 ID 或元数据过滤条件删除向量"""
+        if self._codes is None:
+            return
+        keep = np.ones(len(self._ids), dtype=bool)
+        keep[self._filter_rows(node_ids, filters)] = False
+        for node_id, k in zip(self._ids, keep):
+            if not k:
+                del self.data.text_id_to_ref_doc_id[node_id]
+                self.data.metadata_dict.pop(node_id, None)
+        self._keep_rows(keep)
+
+    def clear(self) -> None:
+        super().clear()
+        self._set_vectors([], None, None, None)
+
+    def query(self, query: VectorStoreQuery, **kwargs: Any) -> VectorStoreQueryResult:
+        """在 int8 向量上计算余弦相似度，返回 top-k 结果"""
+        if query.mode != VectorStoreQueryMode.DEFAULT:
+            raise ValueError(f"QuantizedVectorStore 不支持的检索模式: {query.mode}")
+        if self._codes is None or not self._ids:
+            return VectorStoreQueryResult(similarities=[], ids=[])
+        
+        if query.filters is None and query.node_ids is None:
+            rows = np.arange(len(self._ids))
+        else:
+            rows = self._filter_rows(query.node_ids, query.filters)
+            if rows.size == 0:
+                return VectorStoreQueryResult(similarities=[], ids=[])
+        
+        query_embedding = np.asarray(query.query_embedding, dtype=np.float32)
+        query_norm = float(np.linalg.norm(query_embedding)) or 1.0
+        similarities = (self._codes[rows].astype(np.float32) @ query_embedding) * self._scales[rows]
+        similarities /= np.maximum(self._norms[rows], 1e-12) * query_norm
+        
+        top_k = min(query.similarity_top_k, similarities.size)
+        top = np.argpartition(-similarities, top_k - 1)[:top_k]
+        top = top[np.argsort(-similarities[top])]
+        return VectorStoreQueryResult(
+            similarities=similarities[top].tolist(),
+            ids=[self._ids[rows[i]] for i in top],
+        )
+
+    def persist(self, persist_path: str, fs=None) -> None:
+        """元数据写入 JSON，量化向量写入同名 .npz 文件"""
+        super().persist(persist_path, fs=fs)
+        fs = fs or self._fs
+        with fs.open(persist_path + ".npz", "wb") as f:
+            np.savez(
+                f,
+                ids=np.array(self._ids, dtype=str),
+                codes=self._codes if self._codes is not None else np.zeros((0, 0), dtype=np.int8),
+                scales=self._scales if self._scales is not None else np.zeros(0, dtype=np.float32),
+                norms=self._norms if self._norms is not None else np.zeros(0, dtype=np.float32),
+            )
+
+    @classmethod
+    def from_persist_path(cls, persist_path: str, fs=None) -> "QuantizedVectorStore":
+        """从 JSON 和 .npz 文件加载"""
+        store = super().from_persist_path(persist_path, fs=fs)
+        fs = fs or store._fs
+        with fs.open(persist_path + ".npz", "rb") as f:
+            arrays = np.load(f)
+            if arrays["ids"].size:
+                store._set_vectors(
+                    arrays["ids"].tolist(), arrays["codes"], arrays["scales"], arrays["norms"]
+                )
+        return store
+
+
 # ============================================================
 # 3. 评估函数 - 测试不同的切片参数（通用版本）
 # ============================================================
-def evaluate_splitter(
-    splitter,  # 可以是 SentenceSplitter 或 TokenTextSplitter
-    documents: List[Document],
+async def aevaluate_splitter(
+    index: VectorStoreIndex,
+    nodes: list,
     query: str,
-    config_name: str
+    config_name: str,
+    timings: Dict[str, float]
 ) -> Dict[str, Any]:
     """
     评估特定切片器配置的性能（支持句子切片和 Token 切片）
     
+    切片和建索引由流水线的前两个阶段完成（见 arun_sweep_pipeline），
+    这里负责检索并汇总评估指标。
+    
     Args:
-        splitter: 切片器实例（SentenceSplitter 或 TokenTextSplitter）
-        documents: 要索引的文档列表
+        index: 由该配置切片结果构建的向量索引
+        nodes: 该配置切分得到的节点列表
         query: 测试查询问题
         config_name: 配置名称（用于标识）
+        timings: 流水线前两个阶段的耗时（毫秒），包含 split_time 和 embed_time
     
     Returns:
         包含评估结果的字典
     """
-    print(f"\n{'='*60}")
-    print(f"测试配置: {config_name}")
-    print(f"{'='*60}")
+    # 输出先写入缓冲区，评估结束后一次性输出，避免并发任务的输出交错
+    out = io.StringIO()
+    print(f"\n{'='*60}", file=out)
+    print(f"测试配置: {config_name}", file=out)
+    print(f"{'='*60}", file=out)
     
-    # 记录开始时间
-    start_time = time.time()
-    
-    # 1. 使用句子切片器将文档分割成节点（chunks）
-    nodes = splitter.get_nodes_from_documents(documents)
-    print(f"✓ 文档切片完成: 生成了 {len(nodes)} 个文本块（chunks）")
+    # 1. 切片结果
+    print(f"✓ 文档切片完成: 生成了 {len(nodes)} 个文本块（chunks）", file=out)
     
     # 显示前 3 个节点的信息
-    print(f"\n前 3 个文本块示例:")
+    print(f"\n前 3 个文本块示例:", file=out)
     for i, node in enumerate(nodes[:3]):
-        print(f"\n  块 #{i+1}:")
-        print(f"  - 长度: {len(node.text)} 字符")
-        print(f"  - 预览: {node.text[:100]}...")
-    
-    # 2. 从节点创建向量索引
-    print(f"\n✓ 开始创建向量索引...")
-    index = VectorStoreIndex(nodes)
-    print(f"✓ 向量索引创建完成")
+        print(f"\n  块 #{i+1}:", file=out)
+        print(f"  - 长度: {len(node.text)} 字符", file=out)
+        print(f"  - 预览: {node.text[:100]}...", file=out)
     
-    # 3. 创建查询引擎
-    query_engine = index.as_query_engine(
+    # 2. 创建检索器
+    # 评估指标只依赖检索结果，不需要 LLM 生成回答
+    retriever = index.as_retriever(
         similarity_top_k=3  # 检索最相似的 3 个文本块
     )
     
-    # 4. 执行查询
-    print(f"\n✓ 执行查询: '{query}'")
-    response = query_engine.query(query)
-    
-    # 记录结束时间
-    end_time = time.time()
-    elapsed_time = end_time - start_time
+    # 3. 执行检索
+    print(f"\n✓ 执行检索: '{query}'", file=out)
+    with StageTimer() as t_query:
+        source_nodes = await retriever.aretrieve(query)
     
-    # 5. 显示结果
-    print(f"\n【查询结果】")
-    print(f"回答: {response.response}")
-    print(f"\n【检索到的源文本块】")
-    for i, source_node in enumerate(response.source_nodes):
-        print(f"\n  相关文本块 #{i+1} (相似度分数: {source_node.score:.4f}):")
-        print(f"  {source_node.text[:200]}...")
+    # 4. 显示结果
+    print(f"\n【检索到的源文本块】", file=out)
+    for i, source_node in enumerate(source_nodes):
+        print(f"\n  相关文本块 #{i+1} (相似度分数: {source_node.score:.4f}):", file=out)
+        print(f"  {source_node.text[:200]}...", file=out)
     
-    # 6. 返回评估指标
+    # 5. 返回评估指标（只保留标量，不引用检索到的节点，以便节点文本及时释放）
     results = {
         "config_name": config_name,
         "num_chunks": len(nodes),
-        "query_time": elapsed_time,
-        "response": response.response,
-        "num_sources": len(response.source_nodes),
-        "avg_similarity": sum(node.score for node in response.source_nodes) / len(response.source_nodes) if response.source_nodes else 0
+        **_timing_results(timings, t_query.elapsed_ms),
+        "num_sources": len(source_nodes),
+        "avg_similarity": _mean_score(source_nodes)
     }
     
-    print(f"\n⏱️  总耗时: {elapsed_time:.2f} 秒")
-    print(f"📊 平均相似度分数: {results['avg_similarity']:.4f}")
+    print(f"\n⏱️  耗时: {_format_timings(results)}", file=out)
+    print(f"📊 平均相似度分数: {results['avg_similarity']:.4f}", file=out)
+    _flush_output(out)
     
     return results
 
@@ -187,11 +818,126 @@ def evaluate_splitter(
 # ============================================================
 # 3.2 评估函数 - 专门用于句子窗口切片
 # ============================================================
-def evaluate_sentence_window_splitter(
-    splitter: SentenceWindowNodeParser,
-    documents: List[Document],
+# 窗口上下文和原始句子在节点元数据中使用的键名
+WINDOW_METADATA_KEY = "window"
+ORIGINAL_TEXT_METADATA_KEY = "original_sentence"
+
+# 关键步骤：先用 SentenceSplitter 手动分割文档为基础节点
+# 这样可以避免 SentenceWindowNodeParser 将整个文档当作一个句子
+SENTENCE_WINDOW_BASE_SPLITTER = SentenceSplitter(
+    chunk_size=512,  # 基础分割的块大小
+    chunk_overlap=50,  # 基础分割的重叠大小
+    tokenizer=shared_tokenizer
+)
+
+
+def split_sentence_window_nodes(documents: List[Document]) -> list:
+    """
+    切分所有窗口大小共用的句子窗口节点
+    
+    句子窗口节点只对核心句子做嵌入（窗口元数据不参与 Embedding），
+    因此不同 window_size 下需要嵌入的文本完全相同。这里只切分一次并
+    构建一个共享索引，各配置通过 _apply_window_size 改写窗口元数据即可，
+    无需重新嵌入。
+    
+    Args:
+        documents: 要索引的文档列表
+    
+    Returns:
+        句子窗口节点列表
+    """
+    out = io.StringIO()
+    print(f"✓ 步骤1: 使用 SentenceSplitter 预处理文档...", file=out)
+    base_nodes = SENTENCE_WINDOW_BASE_SPLITTER.get_nodes_from_documents(documents)
+    print(f"✓ 预处理完成: 生成了 {len(base_nodes)} 个基础文本块", file=out)
+    
+    # 节点 ID 由（基础节点序号, 句子序号）确定，而不是随机 UUID：
+    # 共享索引从磁盘缓存加载时，本次切分的节点与缓存文档存储中的节点 ID 一致，
+    # _apply_window_size 改写后写回文档存储，才能覆盖检索时实际返回的节点
+    base_positions = {node.node_id: pos for pos, node in enumerate(base_nodes)}
+    
+    def window_node_id(i: int, base_node) -> str:
+        return f"sentence-window-{base_positions[base_node.node_id]}-{i}"
+    
+    # 在基础节点上切分句子，窗口大小在评估每个配置时再设置
+    print(f"✓ 步骤2: 在基础节点上构建句子窗口节点...", file=out)
+    splitter = SentenceWindowNodeParser.from_defaults(
+        window_size=1,
+        window_metadata_key=WINDOW_METADATA_KEY,
+        original_text_metadata_key=ORIGINAL_TEXT_METADATA_KEY,
+        id_func=window_node_id
+    )
+    nodes = splitter.build_window_nodes_from_documents(base_nodes)
+    print(f"✓ 窗口构建完成: 生成了 {len(nodes)} 个句子节点", file=out)
+    _flush_output(out)
+    
+    return nodes
+
+
+def _apply_window_size(nodes: list, window_size: int) -> None:
+    """
+    按指定窗口大小重写节点的窗口上下文元数据（原地修改）
+    
+    与 SentenceWindowNodeParser 的规则一致：窗口只在同一个源节点的
+    句子范围内取前后各 window_size 个句子，并用空格连接。
+    """
+    start = 0
+    while start < len(nodes):
+        # 找出属于同一个源节点的连续句子
+        end = start
+        while end < len(nodes) and nodes[end].ref_doc_id == nodes[start].ref_doc_id:
+            end += 1
+        group = nodes[start:end]
+        for i, node in enumerate(group):
+            window_nodes = group[max(0, i - window_size):i + window_size + 1]
+            node.metadata[WINDOW_METADATA_KEY] = " ".join(
+                n.metadata[ORIGINAL_TEXT_METADATA_KEY] for n in window_nodes
+            )
+        start = end
+
+
+async def aevaluate_sentence_window_configs(
+    index: VectorStoreIndex,
+    nodes: list,
+    configurations: List[Dict[str, Any]],
     query: str,
-    config_name: str
+    timings: Dict[str, float]
+) -> List[Dict[str, Any]]:
+    """
+    在共享索引上依次评估所有句子窗口配置
+    
+    共享索引的文档存储会被各配置改写，因此这些配置之间按顺序执行。
+    
+    Args:
+        index: 句子窗口节点构建的共享索引
+        nodes: 共享索引中的句子窗口节点
+        configurations: 句子窗口配置列表（包含 name 和 window_size）
+        query: 测试查询问题
+        timings: 共享索引的切片和建索引耗时（毫秒）
+    
+    Returns:
+        每个配置的评估结果列表，顺序与 configurations 一致
+    """
+    results = []
+    for config in configurations:
+        results.append(await aevaluate_sentence_window_splitter(
+            index=index,
+            nodes=nodes,
+            window_size=config["window_size"],
+            query=query,
+            config_name=config["name"],
+            timings=timings
+        ))
+    return results
+
+
+async def aevaluate_sentence_window_splitter(
+    index: VectorStoreIndex,
+    nodes: list,
+    window_size: int,
+    query: str,
+    config_name: str,
+    timings: Dict[str, float]
 ) -> Dict[str, Any]:
     """
     评估句子窗口切片器的性能
@@ -203,100 +949,441 @@ def evaluate_sentence_window_splitter(
     - 这种方法结合了精确检索和丰富上下文的优势
     
     Args:
-        splitter: 句子窗口切片器实例
-        documents: 要索引的文档列表
+        index: 句子窗口节点构建的共享索引
+        nodes: 共享索引中的句子窗口节点
+        window_size: 窗口大小（前后各保留的句子数）
         query: 测试查询问题
         config_name: 配置名称（用于标识）
+        timings: 共享索引的切片和建索引耗时（毫秒），计入总耗时
     
     Returns:
         包含评估结果的字典
     """
-    print(f"\n{'='*60}")
-    print(f"测试配置: {config_name}")
-    print(f"{'='*60}")
-    
-    # 记录开始时间
-    start_time = time.time()
-    
-    # 关键步骤：先用 SentenceSplitter 手动分割文档为基础节点
-    # 这样可以避免 SentenceWindowNodeParser 将整个文档当作一个句子
-    print(f"✓ 步骤1: 使用 SentenceSplitter 预处理文档...")
-    base_splitter = SentenceSplitter(
-        chunk_size=512,  # 基础分割的块大小
-        chunk_overlap=50  # 基础分割的重叠大小
-    )
-    base_nodes = base_splitter.get_nodes_from_documents(documents)
-    print(f"✓ 预处理完成: 生成了 {len(base_nodes)} 个基础文本块")
-    
-    # 在基础节点上应用窗口策略
-    print(f"✓ 步骤2: 在基础节点上构建句子窗口...")
-    nodes = splitter.build_window_nodes_from_documents(base_nodes)
-    print(f"✓ 窗口构建完成: 生成了 {len(nodes)} 个窗口节点")
+    out = io.StringIO()
+    print(f"\n{'='*60}", file=out)
+    print(f"测试配置: {config_name}", file=out)
+    print(f"{'='*60}", file=out)
+    
+    # 1. 按当前窗口大小改写窗口元数据，并同步到索引的文档存储中
+    # 窗口元数据不参与 Embedding，因此不需要重新嵌入
+    with StageTimer() as t_window:
+        _apply_window_size(nodes, window_size)
+        index.docstore.add_documents(nodes, allow_update=True)
+    print(f"✓ 已将窗口大小设置为 {window_size}（复用共享索引，无需重新嵌入）", file=out)
     
     # 显示前 3 个节点的信息
-    print(f"\n前 3 个句子窗口节点示例:")
+    print(f"\n前 3 个句子窗口节点示例:", file=out)
     for i, node in enumerate(nodes[:3]):
-        print(f"\n  窗口节点 #{i+1}:")
-        print(f"  - 核心文本长度: {len(node.text)} 字符")
-        print(f"  - 核心文本: {node.text[:100]}...")
+        print(f"\n  窗口节点 #{i+1}:", file=out)
+        print(f"  - 核心文本长度: {len(node.text)} 字符", file=out)
+        print(f"  - 核心文本: {node.text[:100]}...", file=out)
         # 显示窗口上下文信息（如果有）
-        if 'window' in node.metadata:
-            window_text = node.metadata['window']
-            print(f"  - 窗口上下文长度: {len(window_text)} 字符")
-            print(f"  - 窗口上下文预览: {window_text[:150]}...")
-    
-    # 2. 从节点创建向量索引
-    print(f"\n✓ 开始创建向量索引...")
-    index = VectorStoreIndex(nodes)
-    print(f"✓ 向量索引创建完成")
-    
-    # 3. 创建查询引擎，使用 MetadataReplacementPostProcessor
-    # 这个后处理器会用窗口上下文替换检索到的节点文本
-    query_engine = index.as_query_engine(
-        similarity_top_k=3,  # 检索最相似的 3 个句子节点
-        node_postprocessors=[
-            MetadataReplacementPostProcessor(target_metadata_key="window")
-        ]
+        if WINDOW_METADATA_KEY in node.metadata:
+            window_text = node.metadata[WINDOW_METADATA_KEY]
+            print(f"  - 窗口上下文长度: {len(window_text)} 字符", file=out)
+            print(f"  - 窗口上下文预览: {window_text[:150]}...", file=out)
+    
+    # 2. 创建检索器（评估指标只依赖检索结果，不需要 LLM 生成回答）
+    retriever = index.as_retriever(
+        similarity_top_k=3  # 检索最相似的 3 个句子节点
     )
+    # MetadataReplacementPostProcessor 会用窗口上下文替换检索到的节点文本
+    postprocessor = MetadataReplacementPostProcessor(target_metadata_key=WINDOW_METADATA_KEY)
     
-    # 4. 执行查询
-    print(f"\n✓ 执行查询: '{query}'")
-    response = query_engine.query(query)
-    
-    # 记录结束时间
-    end_time = time.time()
-    elapsed_time = end_time - start_time
+    # 3. 执行检索
+    print(f"\n✓ 执行检索: '{query}'", file=out)
+    with StageTimer() as t_query:
+        source_nodes = postprocessor.postprocess_nodes(await retriever.aretrieve(query))
     
-    # 5. 显示结果
-    print(f"\n【查询结果】")
-    print(f"回答: {response.response}")
-    print(f"\n【检索到的源文本（包含窗口上下文）】")
-    for i, source_node in enumerate(response.source_nodes):
-        print(f"\n  相关句子 #{i+1} (相似度分数: {source_node.score:.4f}):")
-        print(f"  {source_node.text[:300]}...")
+    # 4. 显示结果
+    print(f"\n【检索到的源文本（包含窗口上下文）】", file=out)
+    for i, source_node in enumerate(source_nodes):
+        print(f"\n  相关句子 #{i+1} (相似度分数: {source_node.score:.4f}):", file=out)
+        print(f"  {source_node.text[:300]}...", file=out)
     
-    # 6. 返回评估指标
+    # 5. 返回评估指标（只保留标量，不引用检索到的节点，以便节点文本及时释放）
     results = {
         "config_name": config_name,
         "num_chunks": len(nodes),
-        "query_time": elapsed_time,
-        "response": response.response,
-        "num_sources": len(response.source_nodes),
-        "avg_similarity": sum(node.score for node in response.source_nodes) / len(response.source_nodes) if response.source_nodes else 0
+        **_timing_results(timings, t_window.elapsed_ms + t_query.elapsed_ms),
+        "num_sources": len(source_nodes),
+        "avg_similarity": _mean_score(source_nodes)
     }
     
-    print(f"\n⏱️  总耗时: {elapsed_time:.2f} 秒")
-    print(f"📊 平均相似度分数: {results['avg_similarity']:.4f}")
+    print(f"\n⏱️  耗时: {_format_timings(results)}", file=out)
+    print(f"📊 平均相似度分数: {results['avg_similarity']:.4f}", file=out)
+    _flush_output(out)
     
     return results
 
 
+# ============================================================
+# 3.3 评估流水线 - 切片 / 建索引 / 检索三个阶段重叠执行
+# ============================================================
+def make_splitter_job(
+    splitter,
+    documents: List[Document],
+    query: str,
+    config_name: str
+) -> Dict[str, Any]:
+    """
+    创建句子切片 / Token 切片配置的流水线任务
+    
+    任务是一个字典，包含三个阶段各自要执行的操作：
+    - split: 切分文档，返回节点列表（同步函数，在线程中执行）
+    - cache_key: 该配置的索引缓存键
+    - evaluate: 在构建好的索引上检索，返回评估结果列表（协程函数）
+    """
+    return {
+        "split": lambda: splitter.get_nodes_from_documents(documents),
+        "cache_key": _splitter_cache_key(splitter, documents),
+        "evaluate": lambda index, nodes, timings: _as_list(
+            aevaluate_splitter(index, nodes, query, config_name, timings)
+        ),
+    }
+
+
+def make_sentence_window_job(
+    configurations: List[Dict[str, Any]],
+    documents: List[Document],
+    query: str
+) -> Dict[str, Any]:
+    """创建句子窗口切片的流水线任务（所有窗口大小共用一个索引）"""
+    base_key = _splitter_cache_key(SENTENCE_WINDOW_BASE_SPLITTER, documents)
+    return {
+        "split": lambda: split_sentence_window_nodes(documents),
+        # 节点 ID 改为确定性 ID 后，旧的（随机 ID 的）索引缓存不再可用
+        "cache_key": ("SentenceWindow", "deterministic-ids") + base_key,
+        "evaluate": lambda index, nodes, timings: aevaluate_sentence_window_configs(
+            index, nodes, configurations, query, timings
+        ),
+    }
+
+
+async def _as_list(coro) -> List[Dict[str, Any]]:
+    """将返回单个结果的协程包装为返回结果列表"""
+    return [await coro]
+
+
+async def arun_sweep_pipeline(jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    以生产者-消费者流水线执行所有评估任务
+    
+    三个阶段通过有界的 asyncio.Queue 连接：
+    - 1 个切片 worker：依次切分各配置的文档（CPU 密集）
+    - NUM_INDEX_WORKERS 个建索引 worker：调用 Embedding API 构建索引（网络密集）
+    - NUM_QUERY_WORKERS 个检索 worker：执行检索并汇总评估指标
+    这样一个配置在等待 Embedding 时，下一个配置可以同时进行切片，
+    总耗时趋近于最慢阶段的耗时，而不是各阶段耗时之和。
+    队列容量限制了积压的节点和索引数量（背压）。
+    所有 worker 在同一个 TaskGroup 中运行：任何一个阶段出错（例如 Embedding API
+    返回 401 或触发限流）时，其余 worker 立即被取消并抛出该异常，而不是
+    上游 worker 一直阻塞在已满的队列上。
+    
+    Args:
+        jobs: make_splitter_job / make_sentence_window_job 创建的任务列表
+    
+    Returns:
+        所有配置的评估结果，顺序与 jobs 一致
+    """
+    splits_q: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    indexed_q: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    results_q: asyncio.Queue = asyncio.Queue()
+    
+    async def split_worker():
+        for order, job in enumerate(jobs):
+            with StageTimer() as t_split:
+                nodes = await asyncio.to_thread(job["split"])
+            await splits_q.put((order, job, nodes, {"split_time": t_split.elapsed_ms}))
+        # 所有配置都已切分完成，之后不再分词，释放分词缓存中的文本片段
+        shared_tokenizer.cache_clear()
+        # 通知所有建索引 worker 结束
+        for _ in range(NUM_INDEX_WORKERS):
+            await splits_q.put(None)
+    
+    async def index_worker():
+        while (item := await splits_q.get()) is not None:
+            order, job, nodes, timings = item
+            # 随机抖动，避免多个 worker 同时向 API 发起请求
+            await asyncio.sleep(random.uniform(0, 0.2))
+            # 索引构建是同步的网络请求，放到线程中执行以免阻塞事件循环
+            with StageTimer() as t_embed:
+                index = await asyncio.to_thread(load_or_build_index, nodes, job["cache_key"])
+            timings["embed_time"] = t_embed.elapsed_ms
+            await indexed_q.put((order, job, nodes, index, timings))
+    
+    async def query_worker():
+        while (item := await indexed_q.get()) is not None:
+            order, job, nodes, index, timings = item
+            results = await job["evaluate"](index, nodes, timings)
+            # 评估结果只包含标量指标，评估完成后立即释放该配置的节点和索引，
+            # 避免所有配置的文本块和向量一直驻留到流程结束
+            del item, nodes, index
+            gc.collect()
+            await results_q.put((order, results))
+    
+    async def run_stages():
+        async with asyncio.TaskGroup() as tg:
+            index_workers = [tg.create_task(index_worker()) for _ in range(NUM_INDEX_WORKERS)]
+            for _ in range(NUM_QUERY_WORKERS):
+                tg.create_task(query_worker())
+            
+            await split_worker()
+            for task in index_workers:
+                await task
+            # 所有索引都已进入队列，通知检索 worker 结束
+            for _ in range(NUM_QUERY_WORKERS):
+                await indexed_q.put(None)
+    
+    try:
+        await run_stages()
+    except* Exception as group:
+        # 抛出第一个出错的 worker 的原始异常
+        raise group.exceptions[0]
+    
+    # 各任务完成顺序不确定，按任务顺序整理结果
+    results_by_order = {}
+    while not results_q.empty():
+        order, results = results_q.get_nowait()
+        results_by_order[order] = results
+    return [result for order in range(len(jobs)) for result in results_by_order[order]]
+
+
+# ============================================================
+# 3.4 语料状态缓存 - 语料未变化时跳过整个评估流程
+# ============================================================
+try:
+    # blake3 明显快于 sha256，未安装时回退到 hashlib
+    from blake3 import blake3 as _file_hasher
+    FILE_HASH_NAME = "blake3"
+except ImportError:
+    _file_hasher = hashlib.sha256
+    FILE_HASH_NAME = "sha256"
+
+
+def _file_fingerprint(path: str, prior: Optional[list] = None) -> list:
+    """
+    计算文件指纹 [mtime_ns, size, 内容哈希]
+    
+    mtime 和大小都与上次记录一致时直接复用上次的哈希，不再读取文件。
+    """
+    stat = os.stat(path)
+    if prior and prior[:2] == [stat.st_mtime_ns, stat.st_size]:
+        return prior
+    hasher = _file_hasher()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            hasher.update(block)
+    return [stat.st_mtime_ns, stat.st_size, hasher.hexdigest()]
+
+
+def _load_corpus_state() -> Dict[str, Any]:
+    """读取上次运行记录的语料状态，不存在或损坏时返回空字典"""
+    try:
+        with open(CORPUS_STATE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def compute_corpus_state(query: str) -> Dict[str, Any]:
+    """
+    计算决定评估结果的全部输入的状态
+    
+    包括 data 文件夹中每个 .txt 文件的指纹、测试问题、Embedding 模型，
+    以及本脚本自身的指纹（切片配置写在脚本中，修改配置同样会使缓存失效）。
+    
+    Args:
+        query: 测试查询问题
+    
+    Returns:
+        可以直接写入 JSON 的状态字典
+    """
+    prior = _load_corpus_state()
+    if prior.get("hash") != FILE_HASH_NAME:
+        prior = {}
+    prior_files = prior.get("files", {})
+    
+    files = {}
+    for root, _, filenames in os.walk(DATA_DIR):
+        for filename in sorted(filenames):
+            if filename.endswith(".txt"):
+                path = os.path.join(root, filename)
+                rel_path = os.path.relpath(path, DATA_DIR)
+                files[rel_path] = _file_fingerprint(path, prior_files.get(rel_path))
+    
+    return {
+        "hash": FILE_HASH_NAME,
+        "query": query,
+        "embed_model": Settings.embed_model.model_name,
+        "script": _file_fingerprint(os.path.abspath(__file__), prior.get("script")),
+        "files": files,
+    }
+
+
+def load_cached_results(corpus_state: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """语料状态与上次运行一致时返回上次的评估结果，否则返回 None"""
+    if not corpus_state["files"] or _load_corpus_state() != corpus_state:
+        return None
+    try:
+        with open(RESULTS_CACHE_PATH, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+
+def save_sweep_cache(corpus_state: Dict[str, Any], all_results: List[Dict[str, Any]]) -> None:
+    """保存本次的语料状态和评估结果（先写结果，再写状态）"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(RESULTS_CACHE_PATH, "wb") as f:
+        pickle.dump(all_results, f)
+    with open(CORPUS_STATE_PATH, "w", encoding="utf-8") as f:
+        json.dump(corpus_state, f, ensure_ascii=False, indent=2)
+
+
+# ============================================================
+# 3.5 总结报告
+# ============================================================
+def print_summary_report(all_results: List[Dict[str, Any]]) -> None:
+    """
+    输出所有配置的对比表、最佳配置分析和建议
+    
+    Args:
+        all_results: 所有配置的评估结果（由 arun_sweep_pipeline 返回或从缓存加载）
+    """
+    print(f"\n\n{'='*100}")
+    print(f"测试总结报告 - 句子切片 vs Token 切片 vs 句子窗口切片 三方对比")
+    print(f"{'='*100}\n")
+    
+    print(f"{'配置名称':<60} | {'文本块数':<10} | {'切片(ms)':<10} | {'建索引(ms)':<12} | "
+          f"{'检索(ms)':<10} | {'平均相似度':<12}")
+    print(f"{'-'*60}-+-{'-'*10}-+-{'-'*10}-+-{'-'*12}-+-{'-'*10}-+-{'-'*12}")
+    
+    for result in all_results:
+        print(f"{result['config_name']:<60} | {result['num_chunks']:<10} | "
+              f"{result['split_time']:<10.1f} | {result['embed_time']:<12.1f} | "
+              f"{result['query_time']:<10.1f} | {result['avg_similarity']:<12.4f}")
+    
+    # 将各项指标整理为 numpy 数组，用布尔掩码区分三种切片方法
+    num_results = len(all_results)
+    similarities = np.fromiter((r['avg_similarity'] for r in all_results), dtype=np.float32, count=num_results)
+    num_chunks = np.fromiter((r['num_chunks'] for r in all_results), dtype=np.float32, count=num_results)
+    config_names = [r['config_name'] for r in all_results]
+    sentence_mask = np.array(["句子切片-" in name for name in config_names], dtype=bool)
+    token_mask = np.array(["Token切片" in name for name in config_names], dtype=bool)
+    window_mask = np.array(["句子窗口" in name for name in config_names], dtype=bool)
+    
+    def best_result(mask: np.ndarray) -> Dict[str, Any]:
+        """返回掩码范围内平均相似度最高的配置结果"""
+        candidates = np.flatnonzero(mask)
+        return all_results[int(candidates[np.argmax(similarities[candidates])])]
+    
+    def masked_mean(values: np.ndarray, mask: np.ndarray) -> float:
+        """计算掩码范围内的平均值，范围为空时返回 0"""
+        return float(values[mask].mean()) if mask.any() else 0
+    
+    print(f"\n{'='*100}")
+    print(f"最佳配置分析")
+    print(f"{'='*100}")
+    
+    if sentence_mask.any():
+        best_sentence = best_result(sentence_mask)
+        print(f"\n🏆 句子切片最佳配置: {best_sentence['config_name']}")
+        print(f"   - 平均相似度分数: {best_sentence['avg_similarity']:.4f}")
+        print(f"   - 生成文本块数: {best_sentence['num_chunks']}")
+        print(f"   - 总耗时: {best_sentence['total_time'] / 1000:.2f} 秒（检索 {best_sentence['query_time']:.1f} ms）")
+    
+    if token_mask.any():
+        best_token = best_result(token_mask)
+        print(f"\n🏆 Token 切片最佳配置: {best_token['config_name']}")
+        print(f"   - 平均相似度分数: {best_token['avg_similarity']:.4f}")
+        print(f"   - 生成文本块数: {best_token['num_chunks']}")
+        print(f"   - 总耗时: {best_token['total_time'] / 1000:.2f} 秒（检索 {best_token['query_time']:.1f} ms）")
+    
+    if window_mask.any():
+        best_window = best_result(window_mask)
+        print(f"\n🏆 句子窗口切片最佳配置: {best_window['config_name']}")
+        print(f"   - 平均相似度分数: {best_window['avg_similarity']:.4f}")
+        print(f"   - 生成文本块数: {best_window['num_chunks']}")
+        print(f"   - 总耗时: {best_window['total_time'] / 1000:.2f} 秒（检索 {best_window['query_time']:.1f} ms）")
+    
+    # 总体最佳配置
+    overall_best = all_results[int(np.argmax(similarities))]
+    print(f"\n🎯 总体最佳配置: {overall_best['config_name']}")
+    print(f"   - 平均相似度分数: {overall_best['avg_similarity']:.4f}")
+    print(f"   - 生成文本块数: {overall_best['num_chunks']}")
+    print(f"   - 总耗时: {overall_best['total_time'] / 1000:.2f} 秒（检索 {overall_best['query_time']:.1f} ms）")
+    
+    # 关键洞察
+    print(f"\n{'='*100}")
+    print(f"关键洞察")
+    print(f"{'='*100}")
+    
+    avg_sentence_chunks = masked_mean(num_chunks, sentence_mask)
+    avg_token_chunks = masked_mean(num_chunks, token_mask)
+    avg_window_chunks = masked_mean(num_chunks, window_mask)
+    
+    avg_sentence_similarity = masked_mean(similarities, sentence_mask)
+    avg_token_similarity = masked_mean(similarities, token_mask)
+    avg_window_similarity = masked_mean(similarities, window_mask)
+    
+    print(f"\n📊 句子切片统计:")
+    print(f"   - 平均生成文本块数: {avg_sentence_chunks:.1f}")
+    print(f"   - 平均相似度分数: {avg_sentence_similarity:.4f}")
+    
+    print(f"\n📊 Token 切片统计:")
+    print(f"   - 平均生成文本块数: {avg_token_chunks:.1f}")
+    print(f"   - 平均相似度分数: {avg_token_similarity:.4f}")
+    
+    print(f"\n📊 句子窗口切片统计:")
+    print(f"   - 平均生成文本块数: {avg_window_chunks:.1f}")
+    print(f"   - 平均相似度分数: {avg_window_similarity:.4f}")
+    
+    print(f"\n💡 建议:")
+    
+    # 找出表现最好的方法
+    method_scores = {
+        "句子切片": avg_sentence_similarity,
+        "Token 切片": avg_token_similarity,
+        "句子窗口切片": avg_window_similarity
+    }
+    best_method = max(method_scores, key=method_scores.get)
+    
+    if best_method == "句子切片":
+        print(f"   ✨ 句子切片在本次测试中表现最好（平均相似度: {avg_sentence_similarity:.4f}）")
+        print(f"   📌 句子切片能更好地保持语义完整性，适合问答和对话系统。")
+        print(f"   📌 适用场景：需要保持句子完整性和上下文连贯性的应用")
+    elif best_method == "Token 切片":
+        print(f"   ✨ Token 切片在本次测试中表现最好（平均相似度: {avg_token_similarity:.4f}）")
+        print(f"   📌 Token 切片能更精确地控制文本块大小，适合有严格长度限制的场景。")
+        print(f"   📌 适用场景：API token 限制、模型上下文窗口限制等")
+    else:
+        print(f"   ✨ 句子窗口切片在本次测试中表现最好（平均相似度: {avg_window_similarity:.4f}）")
+        print(f"   📌 句子窗口切片兼顾检索精确性和上下文完整性，是一种平衡方案。")
+        print(f"   📌 适用场景：问答系统、信息检索、需要精确定位但又要提供充足上下文的场景")
+        print(f"   📌 特别推荐：当答案可能在单个句子中，但需要周围句子才能完全理解时")
+    
+    # 提供综合建议
+    print(f"\n🎯 综合建议:")
+    print(f"   - 如果需要精确检索单个概念或事实 → 推荐句子窗口切片（窗口大小2-3）")
+    print(f"   - 如果需要保持段落级别的语义完整性 → 推荐句子切片（块大小512-1024）")
+    print(f"   - 如果有严格的 token 数量限制 → 推荐 Token 切片（根据限制调整块大小）")
+    print(f"   - 如果文档结构复杂且答案分散 → 建议测试多种方法并结合使用")
+    
+    print(f"\n{'='*100}")
+    print(f"测试完成！")
+    print(f"{'='*100}")
+
+
 # ============================================================
 # 4. 主函数 - 测试不同的参数组合
 # ============================================================
-def main():
+async def main_async():
     """
     主测试函数：测试不同的句子切片参数对检索效果的影响
+    
+    所有配置的评估任务通过切片 / 建索引 / 检索三阶段流水线执行，
+    不同配置的不同阶段可以重叠进行。
     """
     # 验证 API Key
     dashscope_api_key = os.getenv("DASHSCOPE_API_KEY")
@@ -307,9 +1394,20 @@ def main():
     print(f"✓ DashScope API Key 已加载")
     print(f"\n{'#'*80}")
     print(f"# LlamaIndex 文本切片参数影响测试")
-    print(f"# 包括：句子切片（SentenceSplitter）和 Token 切片（TokenTextSplitter）")
+    print(f"# 包括：句子切片（SentenceSplitter）和 Token 切片（NumpyTokenSplitter）")
     print(f"{'#'*80}\n")
     
+    # 定义测试查询
+    test_query = "什么是深度学习？它与机器学习有什么关系？"
+    
+    # data 文件夹、测试问题和脚本都没有变化时，直接输出上次的报告
+    corpus_state = compute_corpus_state(test_query)
+    cached_results = load_cached_results(corpus_state)
+    if cached_results is not None:
+        print(f"✓ 语料和配置与上次运行一致，直接使用缓存的评估结果: {RESULTS_CACHE_PATH}")
+        print_summary_report(cached_results)
+        return
+    
     # 从 data 文件夹加载测试文档
     try:
         documents = load_documents_from_data_folder()
@@ -319,10 +1417,11 @@ def main():
     
     print(f"\n✓ 文档加载完成，共 {len(documents)} 个文档")
     
-    # 定义测试查询
-    test_query = "什么是深度学习？它与机器学习有什么关系？"
     print(f"✓ 测试问题: {test_query}")
     
+    # 预先计算查询向量，所有配置的检索都复用这一次结果
+    Settings.embed_model.get_query_embedding(test_query)
+    
     # ============================================================
     # 第一部分：测试句子切片（SentenceSplitter）参数配置
     # ============================================================
@@ -364,8 +1463,8 @@ def main():
         },
     ]
     
-    # 存储所有测试结果
-    all_results = []
+    # 所有待执行的流水线任务，按配置顺序排列
+    jobs = []
     
     # 遍历每个句子切片配置进行测试
     for config in sentence_configurations:
@@ -374,33 +1473,28 @@ def main():
             chunk_size=config["chunk_size"],
             chunk_overlap=config["chunk_overlap"],
             paragraph_separator="\n\n",  # 使用双换行作为段落分隔符
+            tokenizer=shared_tokenizer
         )
         
-        # 执行评估
-        result = evaluate_splitter(
+        # 创建评估任务
+        jobs.append(make_splitter_job(
             splitter=splitter,
             documents=documents,
             query=test_query,
             config_name=config["name"]
-        )
-        
-        all_results.append(result)
-        
-        # 在测试之间稍作延迟，避免 API 限流
-        time.sleep(2)
+        ))
     
     # ============================================================
-    # 第二部分：测试 Token 切片（TokenTextSplitter）参数配置
+    # 第二部分：测试 Token 切片（NumpyTokenSplitter）参数配置
     # ============================================================
     print(f"\n\n{'*'*80}")
-    print(f"* 第二部分：Token 切片（TokenTextSplitter）测试")
+    print(f"* 第二部分：Token 切片（NumpyTokenSplitter）测试")
     print(f"* 说明：按照 Token 数量进行切片，更精确地控制文本块大小")
     print(f"{'*'*80}")
     
     # Token 切片参数说明:
     # - chunk_size: 每个文本块的最大 Token 数量
     # - chunk_overlap: 相邻文本块之间的重叠 Token 数量
-    # - separator: Token 分隔符（默认为空格）
     #
     # 注意：Token 切片与句子切片的主要区别：
     # 1. Token 切片按 token 数量切分，更精确地控制大小
@@ -439,25 +1533,19 @@ def main():
     # 遍历每个 Token 切片配置进行测试
     for config in token_configurations:
         # 创建 Token 切片器
-        # TokenTextSplitter 使用分词器将文本分割成 tokens，然后按指定大小切片
-        splitter = TokenTextSplitter(
+        # 文档只编码一次，之后各配置直接对 token 数组切片（见 NumpyTokenSplitter）
+        splitter = NumpyTokenSplitter(
             chunk_size=config["chunk_size"],
-            chunk_overlap=config["chunk_overlap"],
-            separator=" ",  # 使用空格作为基本分隔符
+            chunk_overlap=config["chunk_overlap"]
         )
         
-        # 执行评估
-        result = evaluate_splitter(
+        # 创建评估任务
+        jobs.append(make_splitter_job(
             splitter=splitter,
             documents=documents,
             query=test_query,
             config_name=config["name"]
-        )
-        
-        all_results.append(result)
-        
-        # 在测试之间稍作延迟，避免 API 限流
-        time.sleep(2)
+        ))
     
     # ============================================================
     # 第三部分：测试句子窗口切片（SentenceWindowNodeParser）参数配置
@@ -507,139 +1595,33 @@ def main():
         },
     ]
     
-    # 遍历每个句子窗口配置进行测试
-    for config in sentence_window_configurations:
-        # 创建句子窗口切片器
-        # 注意：SentenceWindowNodeParser 会使用 Settings.text_splitter 来分割文本
-        splitter = SentenceWindowNodeParser.from_defaults(
-            window_size=config["window_size"],
-            window_metadata_key="window",  # 窗口上下文存储在 'window' 元数据中
-            original_text_metadata_key="original_sentence"  # 原始句子存储键
-        )
-        
-        # 执行评估（使用专门的句子窗口评估函数）
-        result = evaluate_sentence_window_splitter(
-            splitter=splitter,
-            documents=documents,
-            query=test_query,
-            config_name=config["name"]
-        )
-        
-        all_results.append(result)
-        
-        # 在测试之间稍作延迟，避免 API 限流
-        time.sleep(2)
+    # 所有窗口大小共用一个索引，只在评估时改写窗口元数据
+    jobs.append(make_sentence_window_job(
+        configurations=sentence_window_configurations,
+        documents=documents,
+        query=test_query
+    ))
     
     # ============================================================
-    # 输出总结报告
+    # 通过流水线执行所有评估任务
     # ============================================================
-    print(f"\n\n{'='*100}")
-    print(f"测试总结报告 - 句子切片 vs Token 切片 vs 句子窗口切片 三方对比")
-    print(f"{'='*100}\n")
-    
-    print(f"{'配置名称':<60} | {'文本块数':<10} | {'查询耗时(秒)':<14} | {'平均相似度':<12}")
-    print(f"{'-'*60}-+-{'-'*10}-+-{'-'*14}-+-{'-'*12}")
+    print(f"\n✓ 开始执行 {len(jobs)} 个流水线任务"
+          f"（建索引 worker: {NUM_INDEX_WORKERS}，检索 worker: {NUM_QUERY_WORKERS}）")
+    # 结果按任务顺序返回，报告中的配置顺序保持不变
+    all_results = await arun_sweep_pipeline(jobs)
     
-    for result in all_results:
-        print(f"{result['config_name']:<60} | {result['num_chunks']:<10} | "
-              f"{result['query_time']:<14.2f} | {result['avg_similarity']:<12.4f}")
+    # 记录本次的语料状态和评估结果，下次语料未变化时直接输出报告
+    save_sweep_cache(corpus_state, all_results)
     
-    # 分别找出三种切片方法的最佳配置
-    sentence_results = [r for r in all_results if "句子切片-" in r['config_name']]
-    token_results = [r for r in all_results if "Token切片" in r['config_name']]
-    window_results = [r for r in all_results if "句子窗口" in r['config_name']]
-    
-    print(f"\n{'='*100}")
-    print(f"最佳配置分析")
-    print(f"{'='*100}")
-    
-    if sentence_results:
-        best_sentence = max(sentence_results, key=lambda x: x['avg_similarity'])
-        print(f"\n🏆 句子切片最佳配置: {best_sentence['config_name']}")
-        print(f"   - 平均相似度分数: {best_sentence['avg_similarity']:.4f}")
-        print(f"   - 生成文本块数: {best_sentence['num_chunks']}")
-        print(f"   - 查询耗时: {best_sentence['query_time']:.2f} 秒")
-    
-    if token_results:
-        best_token = max(token_results, key=lambda x: x['avg_similarity'])
-        print(f"\n🏆 Token 切片最佳配置: {best_token['config_name']}")
-        print(f"   - 平均相似度分数: {best_token['avg_similarity']:.4f}")
-        print(f"   - 生成文本块数: {best_token['num_chunks']}")
-        print(f"   - 查询耗时: {best_token['query_time']:.2f} 秒")
-    
-    if window_results:
-        best_window = max(window_results, key=lambda x: x['avg_similarity'])
-        print(f"\n🏆 句子窗口切片最佳配置: {best_window['config_name']}")
-        print(f"   - 平均相似度分数: {best_window['avg_similarity']:.4f}")
-        print(f"   - 生成文本块数: {best_window['num_chunks']}")
-        print(f"   - 查询耗时: {best_window['query_time']:.2f} 秒")
-    
-    # 总体最佳配置
-    overall_best = max(all_results, key=lambda x: x['avg_similarity'])
-    print(f"\n🎯 总体最佳配置: {overall_best['config_name']}")
-    print(f"   - 平均相似度分数: {overall_best['avg_similarity']:.4f}")
-    print(f"   - 生成文本块数: {overall_best['num_chunks']}")
-    print(f"   - 查询耗时: {overall_best['query_time']:.2f} 秒")
-    
-    # 关键洞察
-    print(f"\n{'='*100}")
-    print(f"关键洞察")
-    print(f"{'='*100}")
-    
-    avg_sentence_chunks = sum(r['num_chunks'] for r in sentence_results) / len(sentence_results) if sentence_results else 0
-    avg_token_chunks = sum(r['num_chunks'] for r in token_results) / len(token_results) if token_results else 0
-    avg_window_chunks = sum(r['num_chunks'] for r in window_results) / len(window_results) if window_results else 0
-    
-    avg_sentence_similarity = sum(r['avg_similarity'] for r in sentence_results) / len(sentence_results) if sentence_results else 0
-    avg_token_similarity = sum(r['avg_similarity'] for r in token_results) / len(token_results) if token_results else 0
-    avg_window_similarity = sum(r['avg_similarity'] for r in window_results) / len(window_results) if window_results else 0
-    
-    print(f"\n📊 句子切片统计:")
-    print(f"   - 平均生成文本块数: {avg_sentence_chunks:.1f}")
-    print(f"   - 平均相似度分数: {avg_sentence_similarity:.4f}")
-    
-    print(f"\n📊 Token 切片统计:")
-    print(f"   - 平均生成文本块数: {avg_token_chunks:.1f}")
-    print(f"   - 平均相似度分数: {avg_token_similarity:.4f}")
-    
-    print(f"\n📊 句子窗口切片统计:")
-    print(f"   - 平均生成文本块数: {avg_window_chunks:.1f}")
-    print(f"   - 平均相似度分数: {avg_window_similarity:.4f}")
-    
-    print(f"\n💡 建议:")
-    
-    # 找出表现最好的方法
-    method_scores = {
-        "句子切片": avg_sentence_similarity,
-        "Token 切片": avg_token_similarity,
-        "句子窗口切片": avg_window_similarity
-    }
-    best_method = max(method_scores, key=method_scores.get)
-    
-    if best_method == "句子切片":
-        print(f"   ✨ 句子切片在本次测试中表现最好（平均相似度: {avg_sentence_similarity:.4f}）")
-        print(f"   📌 句子切片能更好地保持语义完整性，适合问答和对话系统。")
-        print(f"   📌 适用场景：需要保持句子完整性和上下文连贯性的应用")
-    elif best_method == "Token 切片":
-        print(f"   ✨ Token 切片在本次测试中表现最好（平均相似度: {avg_token_similarity:.4f}）")
-        print(f"   📌 Token 切片能更精确地控制文本块大小，适合有严格长度限制的场景。")
-        print(f"   📌 适用场景：API token 限制、模型上下文窗口限制等")
-    else:
-        print(f"   ✨ 句子窗口切片在本次测试中表现最好（平均相似度: {avg_window_similarity:.4f}）")
-        print(f"   📌 句子窗口切片兼顾检索精确性和上下文完整性，是一种平衡方案。")
-        print(f"   📌 适用场景：问答系统、信息检索、需要精确定位但又要提供充足上下文的场景")
-        print(f"   📌 特别推荐：当答案可能在单个句子中，但需要周围句子才能完全理解时")
-    
-    # 提供综合建议
-    print(f"\n🎯 综合建议:")
-    print(f"   - 如果需要精确检索单个概念或事实 → 推荐句子窗口切片（窗口大小2-3）")
-    print(f"   - 如果需要保持段落级别的语义完整性 → 推荐句子切片（块大小512-1024）")
-    print(f"   - 如果有严格的 token 数量限制 → 推荐 Token 切片（根据限制调整块大小）")
-    print(f"   - 如果文档结构复杂且答案分散 → 建议测试多种方法并结合使用")
-    
-    print(f"\n{'='*100}")
-    print(f"测试完成！")
-    print(f"{'='*100}")
+    print_summary_report(all_results)
+
+
+def main():
+    """程序入口：运行异步主函数"""
+    # 评估函数自行缓冲并一次性输出，关闭行缓冲减少终端刷新次数
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(line_buffering=False, write_through=False)
+    asyncio.run(main_async())
 
 
 if __name__ == "__main__":
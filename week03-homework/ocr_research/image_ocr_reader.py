@@ -14,11 +14,526 @@ LlamaIndex 可以处理的 Document 对象。
 
 from llama_index.core.readers.base import BaseReader
 from llama_index.core.schema import Document
-from paddleocr import PaddleOCR
-from typing import List, Union, Dict, Any, Optional
+from typing import List, Union, Dict, Any, Optional, Sequence, Iterator
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools import lru_cache
+import asyncio
+import hashlib
+import io
+import json
 import os
+import multiprocessing
+import time
+import queue
+import weakref
+import threading
 from pathlib import Path
 
+import numpy as np
+
+# cv2 只在读图和预处理时导入（见 _read_image 等）：导入 opencv 需要加载较大的动态库，
+# 只导入 ImageOCRReader、或把图像路径直接交给 PaddleOCR 时不需要这部分开销
+
+# PaddleOCR 在第一次创建实例时才导入（见 _get_paddle_ocr）：导入 paddle 会加载
+# 数百 MB 的动态库，只导入 ImageOCRReader 而不做识别时不需要这部分开销
+PaddleOCR = None
+
+# numba 为可选依赖：安装后文本块的数值计算由 JIT 编译的内核完成，否则使用 numpy 实现
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# orjson 为可选依赖：安装后检测框数组直接在 C 中序列化为 JSON，否则使用标准库 json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class _FrozenDict(tuple):
+    """字典参数的可哈希表示（用作模型缓存的键）"""
+
+
+class _FrozenList(tuple):
+    """列表参数的可哈希表示（_thaw 时还原为 list）"""
+
+
+def _freeze(value: Any) -> Any:
+    """
+    将参数值转换为可哈希的形式：dict → _FrozenDict，list → _FrozenList，tuple 递归转换
+    
+    集合、numpy 数组等其他不可哈希的值保持原样，此时结果不可哈希，
+    调用方需要检查（见 ImageOCRReader.__init__）。
+    """
+    if isinstance(value, dict):
+        return _FrozenDict(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, list):
+        return _FrozenList(_freeze(v) for v in value)
+    if isinstance(value, tuple):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """_freeze 的逆操作，还原字典、列表参数（包括嵌套在列表/元组中的）"""
+    if isinstance(value, _FrozenDict):
+        return {k: _thaw(v) for k, v in value}
+    if isinstance(value, _FrozenList):
+        return [_thaw(v) for v in value]
+    if isinstance(value, tuple):
+        return tuple(_thaw(v) for v in value)
+    return value
+
+
+def _is_hashable(value: Any) -> bool:
+    """判断值能否作为 lru_cache 的键"""
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+# 支持的图像格式（小写扩展名，不含点号）
+_SUPPORTED_EXTS = frozenset({'png', 'jpg', 'jpeg', 'bmp', 'tiff', 'tif', 'webp'})
+
+
+def _file_ext(path: str) -> str:
+    """
+    返回小写扩展名（不含点号），规则与 Path.suffix 一致，但不构造 Path 对象
+    
+    Args:
+        path (str): 文件路径或文件名
+    
+    Returns:
+        str: 扩展名，没有扩展名（含 ".bashrc" 这类隐藏文件）时返回空字符串
+    """
+    stem, _, ext = os.path.basename(path).rpartition('.')
+    return ext.lower() if stem else ''
+
+
+def _scan_images(dir_path: str, recursive: bool) -> List[str]:
+    """
+    用 os.scandir 查找目录中的图像文件
+    
+    scandir 返回的目录项自带文件类型信息，不需要像 Path.rglob + is_file 那样
+    对每个条目再做一次 stat。
+    
+    Args:
+        dir_path (str): 目录路径
+        recursive (bool): 是否递归搜索子目录
+    
+    Returns:
+        List[str]: 图像文件路径列表
+    """
+    image_files = []
+    pending = [dir_path]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        pending.append(entry.path)
+                elif (_file_ext(entry.name) in _SUPPORTED_EXTS
+                      and entry.is_file(follow_symlinks=False)):
+                    image_files.append(entry.path)
+    return image_files
+
+
+# 已完成 GPU 预热的 PaddleOCR 实例（模型被缓存共用，每个实例只需预热一次）
+_warmed_up_models: "weakref.WeakSet[PaddleOCR]" = weakref.WeakSet()
+
+# 持有工作进程池的 Reader（clear_model_cache 时一并关闭它们的进程池）
+_pooled_readers: "weakref.WeakSet[ImageOCRReader]" = weakref.WeakSet()
+
+
+def _read_image(file_path: Path, flags: Optional[int] = None) -> np.ndarray:
+    """读取图像为 BGR（或 flags 指定的）数组（np.fromfile + imdecode 可以读取包含中文的路径）"""
+    import cv2
+    if flags is None:
+        flags = cv2.IMREAD_COLOR
+    image = cv2.imdecode(np.fromfile(str(file_path), dtype=np.uint8), flags)
+    if image is None:
+        raise ValueError(f"无法读取图像: {file_path}")
+    return image
+
+
+# 可选的预处理操作
+_PREPROCESS_OPS = frozenset({'otsu', 'deskew', 'downscale'})
+
+
+def _estimate_skew(binary: np.ndarray, max_angle: float = 5.0, step: float = 0.5) -> float:
+    """
+    用投影轮廓法估计文本倾斜角度
+    
+    在 ±max_angle 范围内旋转图像，文本行与水平方向对齐时，逐行的黑色像素数
+    起伏最大（行内密集、行间空白），取行投影方差最大的角度。
+    为了减少计算量，在长边不超过 512 像素的缩略图上搜索。
+    
+    Args:
+        binary (np.ndarray): 二值化后的灰度图（白底黑字）
+        max_angle (float): 搜索的最大角度（度）
+        step (float): 角度步长（度）
+    
+    Returns:
+        float: 需要旋转的角度（度，逆时针为正）
+    """
+    import cv2
+    h, w = binary.shape
+    scale = min(1.0, 512 / max(h, w))
+    if scale < 1.0:
+        binary = cv2.resize(binary, (max(1, int(w * scale)), max(1, int(h * scale))),
+                            interpolation=cv2.INTER_AREA)
+        h, w = binary.shape
+    ink = (binary < 128).astype(np.float32)
+    
+    best_angle, best_score = 0.0, -1.0
+    for angle in np.arange(-max_angle, max_angle + step / 2, step):
+        matrix = cv2.getRotationMatrix2D((w / 2, h / 2), float(angle), 1.0)
+        rotated = cv2.warpAffine(ink, matrix, (w, h), flags=cv2.INTER_NEAREST, borderValue=0)
+        score = float(np.var(rotated.sum(axis=1)))
+        if score > best_score:
+            best_angle, best_score = float(angle), score
+    return best_angle
+
+
+def _preprocess_image(
+    file_path: Path,
+    ops: frozenset,
+    max_side_len: int = 1920
+) -> np.ndarray:
+    """
+    读取灰度图并按 ops 执行预处理，返回三通道 BGR 数组
+    
+    - downscale: 长边缩小到 max_side_len 以内，减少检测/识别模型处理的像素数
+    - otsu: Otsu 自动阈值二值化
+    - deskew: 投影轮廓法纠正 ±5° 以内的倾斜
+    
+    Args:
+        file_path (Path): 图像路径
+        ops (frozenset): 要执行的预处理操作，取值见 _PREPROCESS_OPS
+        max_side_len (int): downscale 的长边上限
+    
+    Returns:
+        np.ndarray: 形状为 [H, W, 3] 的 uint8 数组
+    """
+    import cv2
+    gray = _read_image(file_path, cv2.IMREAD_GRAYSCALE)
+    
+    if 'downscale' in ops:
+        h, w = gray.shape
+        scale = max_side_len / max(h, w)
+        if scale < 1.0:
+            gray = cv2.resize(gray, (max(1, int(w * scale)), max(1, int(h * scale))),
+                              interpolation=cv2.INTER_AREA)
+    
+    if 'otsu' in ops:
+        _, gray = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    
+    if 'deskew' in ops:
+        if 'otsu' in ops:
+            binary = gray
+        else:
+            _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        angle = _estimate_skew(binary)
+        if angle:
+            h, w = gray.shape
+            matrix = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+            gray = cv2.warpAffine(
+                gray, matrix, (w, h),
+                flags=cv2.INTER_NEAREST if 'otsu' in ops else cv2.INTER_LINEAR,
+                borderValue=255,
+            )
+    
+    # PaddleOCR 的检测模型需要三通道输入
+    return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+
+
+def _pad_images(
+    images: List[np.ndarray],
+    n_width: Optional[int] = None,
+    n_height: Optional[int] = None
+) -> np.ndarray:
+    """
+    将一批图像填充到相同尺寸，放入一块连续内存
+    
+    只在右侧和下方补 0（与检测模型预处理的填充方式一致），
+    原图内容的坐标不变，识别结果中的检测框无需换算。
+    
+    Args:
+        images (List[np.ndarray]): BGR 图像列表
+        n_width (Optional[int]): 目标宽度，默认为本批图像的最大宽度
+        n_height (Optional[int]): 目标高度，默认为本批图像的最大高度
+    
+    Returns:
+        np.ndarray: 形状为 [B, H, W, 3] 的 uint8 数组
+    """
+    n_height = n_height or max(image.shape[0] for image in images)
+    n_width = n_width or max(image.shape[1] for image in images)
+    batch = np.zeros((len(images), n_height, n_width, 3), dtype=np.uint8)
+    for i, image in enumerate(images):
+        h, w = image.shape[:2]
+        if h > n_height or w > n_width:
+            raise ValueError(f"图像尺寸 {w}x{h} 超过目标尺寸 {n_width}x{n_height}")
+        batch[i, :h, :w] = image
+    return batch
+
+
+# 同一组图像填充后的画布面积最多为组内最小图像面积的倍数
+_MAX_PAD_RATIO = 1.5
+
+
+def _pad_by_size(images: List[np.ndarray], max_pad_ratio: float = _MAX_PAD_RATIO) -> List[np.ndarray]:
+    """
+    按尺寸分组填充一批图像，返回与 images 顺序一致的数组列表
+    
+    检测模型会把整张（填充后的）画布缩放到边长上限以内，小图和大图填充到同一尺寸时，
+    小图实际上被缩小，检出率下降，填充区域也会增加计算量。这里按面积排序后，
+    把尺寸相近的图像分为一组，组内填充后的画布面积不超过组内最小图像面积的
+    max_pad_ratio 倍；超出时另起一组（尺寸相差较大的图像单独提交，不填充）。
+    
+    Args:
+        images (List[np.ndarray]): BGR 图像列表
+        max_pad_ratio (float): 填充后画布面积与组内最小图像面积之比的上限
+    
+    Returns:
+        List[np.ndarray]: 每张图像填充后的数组（同组图像是同一块连续内存中的切片）
+    """
+    order = sorted(range(len(images)), key=lambda i: images[i].shape[0] * images[i].shape[1])
+    padded: List[Optional[np.ndarray]] = [None] * len(images)
+    
+    def flush(group: List[int]) -> None:
+        batch = _pad_images([images[i] for i in group])
+        for i, image in zip(group, batch):
+            padded[i] = image
+    
+    group: List[int] = []
+    min_area = n_height = n_width = 0
+    for i in order:
+        h, w = images[i].shape[:2]
+        if group:
+            canvas_area = max(n_height, h) * max(n_width, w)
+            if canvas_area > max_pad_ratio * min_area:
+                flush(group)
+                group = []
+        if not group:
+            min_area, n_height, n_width = h * w, h, w
+        n_height, n_width = max(n_height, h), max(n_width, w)
+        group.append(i)
+    if group:
+        flush(group)
+    return padded
+
+
+# 没有检测框时传给 _parse_blocks 的空数组
+_EMPTY_POLYS = np.empty((0, 4, 2), dtype=np.float32)
+
+
+def _to_polys(boxes: Sequence[Any]) -> Optional[np.ndarray]:
+    """
+    把检测框列表整体转换为 (N, K, 2) 的 float32 数组
+    
+    各检测框点数不同时（例如 text_det_box_type='poly'）无法组成规则数组，返回 None，
+    此时只返回文本，不返回位置信息。
+    """
+    try:
+        polys = np.asarray(boxes, dtype=np.float32)
+    except ValueError:
+        return None
+    return polys if polys.ndim == 3 else None
+
+
+# 文本块字符串池：扫描件的页眉、页脚、页码等在多页中反复出现，
+# 相同的文本块共用同一个字符串对象。超过上限时整体清空，避免无限增长
+_STRING_POOL: Dict[str, str] = {}
+_STRING_POOL_MAX = 100_000
+
+
+def _intern(text: str) -> str:
+    """返回字符串池中与 text 相同的字符串对象"""
+    pooled = _STRING_POOL.get(text)
+    if pooled is None:
+        if len(_STRING_POOL) >= _STRING_POOL_MAX:
+            _STRING_POOL.clear()
+        _STRING_POOL[text] = pooled = text
+    return pooled
+
+
+# 保留两位小数的置信度只有 101 种取值，预先生成对应的字符串
+_CONF_STRS = [f"(conf: {i / 100:.2f})" for i in range(101)]
+
+
+def _format_confidences(confidences: Sequence[float]) -> List[str]:
+    """
+    把置信度转换为 "(conf: 0.XX)" 字符串，结果与 f"(conf: {c:.2f})" 完全一致
+    
+    大部分值直接查表；超出 [0, 1]、NaN 以及恰好落在两位小数舍入边界上的值
+    （例如 0.005，查表和 f-string 的舍入方式可能不同）仍然逐个格式化。
+    """
+    conf = np.asarray(confidences, dtype=np.float64)
+    scaled = conf * 100
+    rounded = np.rint(scaled)
+    # 按原始值判断范围：小的负数（例如 -0.001）舍入后为 -0.0，f-string 输出 "-0.00"，不能查表；
+    # signbit 同时排除了 -0.0，NaN 不满足 conf <= 1
+    with np.errstate(invalid='ignore'):
+        use_table = (
+            ~np.signbit(conf) & (conf <= 1)
+            & (np.abs(scaled - np.floor(scaled) - 0.5) >= 1e-6)
+        )
+    indices = np.where(use_table, rounded, 0).astype(np.intp)
+    return [
+        _CONF_STRS[i] if ok else f"(conf: {c:.2f})"
+        for i, ok, c in zip(indices.tolist(), use_table.tolist(), conf.tolist())
+    ]
+
+
+def _dumps_array(array: np.ndarray) -> str:
+    """
+    把数值数组序列化为 JSON 字符串
+    
+    orjson 直接遍历 numpy 数组的内存，不需要先 tolist() 生成嵌套的 Python 列表。
+    """
+    if orjson is not None:
+        return orjson.dumps(np.ascontiguousarray(array), option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(array.tolist(), separators=(',', ':'))
+
+
+def _parse_blocks_numpy(scores: np.ndarray, polys: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """_parse_blocks 的 numpy 实现（未安装 numba 时使用）"""
+    if scores.size:
+        stats = np.array([scores.mean(), scores.min(), scores.max()])
+    else:
+        stats = np.zeros(3)
+    rects = np.concatenate([polys.min(axis=1), polys.max(axis=1)], axis=1)
+    x, y = polys[..., 0], polys[..., 1]
+    areas = 0.5 * np.abs(np.sum(x * np.roll(y, -1, axis=1) - np.roll(x, -1, axis=1) * y, axis=1))
+    return stats, rects, areas.astype(np.float32)
+
+
+if njit is not None:
+    @njit(cache=True, parallel=True)
+    def _parse_blocks(scores: np.ndarray, polys: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        计算文本块的数值信息
+        
+        Args:
+            scores (np.ndarray): 置信度数组，形状 (N,)
+            polys (np.ndarray): 检测框多边形，形状 (M, K, 2)
+        
+        Returns:
+            tuple: (置信度的 [平均值, 最小值, 最大值],
+                    外接矩形 [x_min, y_min, x_max, y_max]，形状 (M, 4),
+                    多边形面积，形状 (M,))
+        """
+        stats = np.zeros(3)
+        n = scores.shape[0]
+        if n > 0:
+            total = 0.0
+            lo = scores[0]
+            hi = scores[0]
+            for i in range(n):
+                total += scores[i]
+                lo = min(lo, scores[i])
+                hi = max(hi, scores[i])
+            stats[0] = total / n
+            stats[1] = lo
+            stats[2] = hi
+        
+        m, k = polys.shape[0], polys.shape[1]
+        rects = np.empty((m, 4), dtype=np.float32)
+        areas = np.empty(m, dtype=np.float32)
+        for i in prange(m):
+            x_min = x_max = polys[i, 0, 0]
+            y_min = y_max = polys[i, 0, 1]
+            twice_area = 0.0
+            for j in range(k):
+                x, y = polys[i, j, 0], polys[i, j, 1]
+                x_next, y_next = polys[i, (j + 1) % k, 0], polys[i, (j + 1) % k, 1]
+                x_min, x_max = min(x_min, x), max(x_max, x)
+                y_min, y_max = min(y_min, y), max(y_max, y)
+                # 鞋带公式
+                twice_area += x * y_next - x_next * y
+            rects[i, 0], rects[i, 1], rects[i, 2], rects[i, 3] = x_min, y_min, x_max, y_max
+            areas[i] = abs(twice_area) * 0.5
+        return stats, rects, areas
+else:
+    _parse_blocks = _parse_blocks_numpy
+
+
+def _set_cudnn_flags(exhaustive_search: bool, workspace_size_limit: int) -> None:
+    """
+    设置 Paddle 的 cuDNN 卷积算法搜索参数
+    
+    默认情况下 cuDNN 用启发式规则选择卷积算法；开启穷举搜索后，每种输入尺寸
+    第一次推理时会实测所有可用算法并选用最快的一个，之后的推理都更快。
+    
+    Paddle Inference 的预测器在创建时从环境变量读取 FLAGS_*，因此在创建
+    PaddleOCR 之前同时设置环境变量和 paddle.set_flags。
+    
+    Args:
+        exhaustive_search (bool): 是否穷举搜索卷积算法
+        workspace_size_limit (int): cuDNN 卷积可用的工作空间上限（MB）
+    """
+    flags = {
+        'FLAGS_cudnn_exhaustive_search': exhaustive_search,
+        'FLAGS_conv_workspace_size_limit': workspace_size_limit,
+    }
+    for name, value in flags.items():
+        os.environ[name] = str(int(value))
+    
+    try:
+        import paddle
+        paddle.set_flags(flags)
+    except (ImportError, ValueError) as e:
+        # 未编译 CUDA 的 paddle 没有 cuDNN 相关的 flag
+        print(f"⚠️ 无法设置 cuDNN 参数: {e}")
+
+
+def _create_paddle_ocr(params: Dict[str, Any]) -> "tuple[PaddleOCR, threading.Lock]":
+    """创建 PaddleOCR 实例和它的锁（第一次调用时导入 paddleocr）"""
+    global PaddleOCR
+    if PaddleOCR is None:
+        from paddleocr import PaddleOCR as _PaddleOCR
+        PaddleOCR = _PaddleOCR
+    return PaddleOCR(**params), threading.Lock()
+
+
+@lru_cache(maxsize=4)
+def _get_paddle_ocr(frozen_params: tuple) -> "tuple[PaddleOCR, threading.Lock]":
+    """
+    按参数缓存 PaddleOCR 实例
+    
+    创建 PaddleOCR 需要加载检测/识别模型并分配推理内存，耗时数秒；
+    参数相同的 ImageOCRReader 共用同一个实例。
+    
+    Args:
+        frozen_params (tuple): 排序后的 (参数名, 参数值) 元组，由 _freeze 生成
+    
+    Returns:
+        tuple: (PaddleOCR 实例, 该实例的锁)。实例不是线程安全的，
+            所有共用它的 Reader 都要持有同一把锁再调用 ocr()
+    """
+    return _create_paddle_ocr(_thaw(_FrozenDict(frozen_params)))
+
+
+# 多进程 OCR 时，每个工作进程各自持有的 Reader（由 _init_worker_reader 创建）
+_WORKER_READER: Optional["ImageOCRReader"] = None
+
+
+def _init_worker_reader(reader_kwargs: Dict[str, Any]) -> None:
+    """工作进程初始化：每个进程只加载一次模型"""
+    global _WORKER_READER
+    _WORKER_READER = ImageOCRReader(**reader_kwargs)
+
+
+def _worker_process_chunk(
+    file_paths: List[Path],
+    extra_info: Optional[Dict[str, Any]]
+) -> List[Document]:
+    """在工作进程中识别一组图像，返回的 Document 会被序列化传回主进程"""
+    return _WORKER_READER.load_data(file_paths, extra_info=extra_info)
+
 
 class ImageOCRReader(BaseReader):
     """
@@ -33,6 +548,19 @@ class ImageOCRReader(BaseReader):
         use_gpu (bool): 是否使用 GPU 加速
         ocr_model (PaddleOCR): PaddleOCR 实例
         ocr_version (str): PaddleOCR 版本
+        batch_size (int): 每次调用 PaddleOCR 时传入的图像数量
+        pipeline_threshold (int): 文件数超过该值时使用流水线加载
+        max_wait_ms (float): 流水线中凑批的最长等待时间（毫秒）
+        preprocess (bool): 是否在 OCR 前预处理图像
+        preprocess_ops (frozenset): 启用的预处理操作
+        max_side_len (int): 预处理缩小图像时的长边上限
+        cudnn_exhaustive_search (bool): GPU 上是否穷举搜索 cuDNN 卷积算法
+        cache_dir (Optional[Path]): OCR 结果缓存目录，None 表示不缓存
+        include_confidence_prefix (bool): 文本中每行是否带 [Block N] 和置信度前缀
+        include_plain_section (bool): 文本末尾是否附加纯文本部分
+        include_bbox (bool): 是否在元数据中以 JSON 字符串保存所有检测框
+        num_workers (int): CPU 上并行执行 OCR 的进程数
+        return_details (bool): 是否在元数据中保存文本块详细信息
         additional_params (dict): 传递给 PaddleOCR 的额外参数
     """
     
@@ -44,6 +572,24 @@ class ImageOCRReader(BaseReader):
         use_doc_orientation_classify: bool = False,
         use_doc_unwarping: bool = False,
         use_textline_orientation: bool = False,
+        batch_size: int = 8,
+        rec_batch_num: Optional[int] = None,
+        pipeline_threshold: int = 16,
+        max_wait_ms: float = 50.0,
+        enable_hpi: bool = False,
+        use_tensorrt: bool = False,
+        precision: str = 'fp32',
+        preprocess: bool = False,
+        preprocess_ops: Sequence[str] = ('otsu', 'deskew', 'downscale'),
+        max_side_len: int = 1920,
+        cudnn_exhaustive_search: bool = True,
+        conv_workspace_size_limit: int = 512,
+        cache_dir: Optional[Union[str, Path]] = None,
+        include_confidence_prefix: bool = True,
+        include_plain_section: bool = False,
+        include_bbox: bool = False,
+        num_workers: int = 1,
+        return_details: bool = False,
         **kwargs
     ):
         """
@@ -61,6 +607,58 @@ class ImageOCRReader(BaseReader):
             use_doc_orientation_classify (bool): 是否使用文档方向分类，默认 False
             use_doc_unwarping (bool): 是否使用文本图像矫正，默认 False
             use_textline_orientation (bool): 是否使用文本行方向分类，默认 False
+            batch_size (int): 每次调用 PaddleOCR 时传入的图像数量，默认 8
+                - 多张图像一次传入，模型在内部按批次推理，减少逐张调用的开销
+                - 批次越大，同时驻留内存的图像越多
+            rec_batch_num (Optional[int]): 文本识别模型的批大小
+                - 默认 None：CPU 上为 1（减少推理时的内存占用），GPU 上使用 PaddleOCR 默认值
+                - GPU 上调大可以提高吞吐量
+            pipeline_threshold (int): 文件数超过该值时，读图、OCR、结果处理三个阶段
+                在不同线程中流水线执行，默认 16
+            max_wait_ms (float): 流水线中 OCR 线程凑满一个批次的最长等待时间（毫秒），
+                超时后直接处理已有的图像，默认 50
+            enable_hpi (bool): 是否启用 PaddleOCR 高性能推理，默认 False
+                - 自动选择推理后端：Intel CPU 上通常为 OpenVINO，其他 CPU 为 ONNX Runtime，
+                  NVIDIA GPU 上可配合 use_tensorrt 使用 TensorRT
+                - 需要先安装高性能推理插件：paddleocr install_hpi_deps cpu（或 gpu）
+            use_tensorrt (bool): 是否使用 TensorRT 推理（仅 GPU），默认 False
+            precision (str): TensorRT 推理精度，'fp32'（默认）或 'fp16'
+            preprocess (bool): 是否在 OCR 前用 OpenCV 预处理图像，默认 False
+                - 适合高分辨率照片或扫描件：以灰度读取，缩小后再交给 PaddleOCR
+                - 开启后检测框坐标对应预处理后的图像，而不是原图
+            preprocess_ops (Sequence[str]): 预处理操作，默认 ('otsu', 'deskew', 'downscale')
+                - 'otsu': Otsu 二值化
+                - 'deskew': 纠正 ±5° 以内的倾斜
+                - 'downscale': 长边缩小到 max_side_len 以内
+            max_side_len (int): 'downscale' 的长边上限，默认 1920
+            cudnn_exhaustive_search (bool): GPU 上是否穷举搜索 cuDNN 卷积算法，默认 True
+                - 每种输入尺寸第一次推理时实测并选用最快的卷积算法，之后的推理更快
+                - 使用 engine='onnxruntime' 时对应 CUDA 执行器的 cudnn_conv_algo_search
+                - 仅对 GPU 生效
+            conv_workspace_size_limit (int): cuDNN 卷积可用的工作空间上限（MB），默认 512
+            cache_dir (Optional[Union[str, Path]]): OCR 结果缓存目录，默认 None（不缓存）
+                - 每张图像的 Document 保存为一个 JSON 文件，以图像绝对路径、修改时间、
+                  OCR 版本和影响结果的参数区分；图像修改后自动重新识别
+                - 再次加载相同图像时直接读取缓存，跳过 OCR
+            include_confidence_prefix (bool): Document 文本中每行是否带
+                "[Block N] (conf: 0.XX): " 前缀，默认 True
+            include_plain_section (bool): 是否在文本末尾附加 "=== 纯文本内容 ===" 部分，默认 False
+                - 这一部分与逐行文本内容完全重复，开启后文本长度约为两倍，
+                  Embedding 的 token 数（按量计费、有速率限制）和索引占用的内存也随之翻倍
+            include_bbox (bool): 是否在 metadata['bbox_json'] 中保存所有检测框，默认 False
+                - 形状为 [N][4][2] 的 JSON 字符串，第 i 项对应第 i 个文本块
+                - 整个数组一次序列化（安装 orjson 时在 C 中完成），不逐块生成嵌套列表；
+                  开启后 text_blocks_detail 中的 'bbox' 为 None，不再重复保存
+                - 不参与 Embedding 和 LLM 上下文
+            num_workers (int): CPU 上并行执行 OCR 的进程数，默认 1
+                - 大于 1 时把文件分给多个进程，每个进程加载一份模型，内存占用随进程数增加
+                - 进程池在第一次多进程识别时创建并保留在 Reader 上，之后的调用复用
+                  已加载模型的进程；不再使用时调用 close() 关闭
+                - 每个进程的推理线程数默认为 CPU 核数 / num_workers
+                - 仅对 CPU 生效，GPU 上会被忽略
+            return_details (bool): 是否在元数据中保存每个文本块的详细信息
+                （文本、置信度、检测框），默认 False
+                - 保存在 metadata['text_blocks_detail'] 中，不参与 Embedding 和 LLM 上下文
             **kwargs: 其他传递给 PaddleOCR 的参数，如 det_model_dir, rec_model_dir 等
         
         Example:
@@ -72,8 +670,96 @@ class ImageOCRReader(BaseReader):
         self.lang = lang
         self.use_gpu = use_gpu
         self.ocr_version = ocr_version
+        self.batch_size = max(1, batch_size)
+        self.pipeline_threshold = pipeline_threshold
+        self.max_wait_ms = max_wait_ms
+        self.return_details = return_details
         self.additional_params = kwargs
         
+        # Document 文本格式
+        self.include_confidence_prefix = include_confidence_prefix
+        self.include_plain_section = include_plain_section
+        self.include_bbox = include_bbox
+        
+        # OCR 结果缓存
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        # 影响识别结果和 Document 内容的参数，参数不同的 Reader 不共用缓存
+        cache_params = {
+            'lang': lang,
+            'use_doc_orientation_classify': use_doc_orientation_classify,
+            'preprocess_ops': sorted(preprocess_ops) if preprocess else None,
+            'max_side_len': max_side_len if preprocess else None,
+            'return_details': return_details,
+            'include_confidence_prefix': include_confidence_prefix,
+            'include_plain_section': include_plain_section,
+            'include_bbox': include_bbox,
+            'kwargs': sorted((k, repr(v)) for k, v in kwargs.items()),
+        }
+        self._cache_tag = hashlib.sha1(
+            repr(sorted(cache_params.items())).encode('utf-8')
+        ).hexdigest()[:8]
+        
+        # 每个 Document 都相同的元数据字段，只构造一次
+        self._base_metadata = {
+            # 使用的 OCR 模型版本
+            'ocr_model': ocr_version,
+            # OCR 语言
+            'language': lang,
+            # 是否使用了 GPU
+            'used_gpu': use_gpu,
+        }
+        
+        unknown_ops = set(preprocess_ops) - _PREPROCESS_OPS
+        if unknown_ops:
+            raise ValueError(
+                f"不支持的预处理操作: {', '.join(sorted(unknown_ops))}. "
+                f"支持的操作: {', '.join(sorted(_PREPROCESS_OPS))}"
+            )
+        self.preprocess = preprocess
+        self.preprocess_ops = frozenset(preprocess_ops)
+        self.max_side_len = max_side_len
+        
+        # 多进程 OCR 只用于 CPU：GPU 上多个进程会争用同一块显卡
+        if num_workers > 1 and use_gpu:
+            print("⚠️ num_workers 仅对 CPU 生效，GPU 上使用单进程")
+            num_workers = 1
+        self.num_workers = max(1, num_workers)
+        # 工作进程池在第一次使用时创建（见 _get_process_pool）
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._process_pool_lock = threading.Lock()
+        
+        # 工作进程用相同的参数创建自己的 Reader
+        self._worker_kwargs = {
+            'lang': lang,
+            'use_gpu': use_gpu,
+            'ocr_version': ocr_version,
+            'use_doc_orientation_classify': use_doc_orientation_classify,
+            'use_doc_unwarping': use_doc_unwarping,
+            'use_textline_orientation': use_textline_orientation,
+            'batch_size': batch_size,
+            'rec_batch_num': rec_batch_num,
+            'pipeline_threshold': pipeline_threshold,
+            'max_wait_ms': max_wait_ms,
+            'enable_hpi': enable_hpi,
+            'use_tensorrt': use_tensorrt,
+            'precision': precision,
+            'preprocess': preprocess,
+            'preprocess_ops': tuple(preprocess_ops),
+            'max_side_len': max_side_len,
+            'cudnn_exhaustive_search': cudnn_exhaustive_search,
+            'conv_workspace_size_limit': conv_workspace_size_limit,
+            'include_confidence_prefix': include_confidence_prefix,
+            'include_plain_section': include_plain_section,
+            'include_bbox': include_bbox,
+            'return_details': return_details,
+            **kwargs,
+        }
+        if self.num_workers > 1:
+            # 各进程平分 CPU 核心，避免推理线程互相抢占
+            self._worker_kwargs.setdefault(
+                'cpu_threads', max(1, (os.cpu_count() or 1) // self.num_workers)
+            )
+        
         # 初始化 PaddleOCR
         # PaddleOCR 是一个轻量级的 OCR 工具，支持检测、识别、方向分类等功能
         # 注意：新版本 PaddleOCR 只接受特定的参数，不支持的参数会报错
@@ -81,14 +767,30 @@ class ImageOCRReader(BaseReader):
             'lang': lang,  # 语言
         }
         
-        # 如果使用 GPU，设置使用 GPU
+        # 如果使用 GPU，设置使用 GPU（PaddleOCR 3.x 通过 device 指定设备）
         if use_gpu:
-            ocr_params['use_gpu'] = True
+            ocr_params['device'] = 'gpu'
         
         # 添加方向分类支持（use_angle_cls 是 PaddleOCR 的标准参数）
         if use_doc_orientation_classify:
             ocr_params['use_angle_cls'] = True
         
+        # 高性能推理：由 PaddleOCR 根据硬件选择 OpenVINO / ONNX Runtime / TensorRT 等后端
+        if enable_hpi:
+            ocr_params['enable_hpi'] = True
+        
+        # TensorRT 推理，precision 只在 TensorRT 下生效
+        if use_tensorrt:
+            ocr_params['use_tensorrt'] = True
+            ocr_params['precision'] = precision
+        
+        # 文本识别批大小（PaddleOCR 3.x 中旧参数 rec_batch_num 对应 text_recognition_batch_size）
+        # CPU 上默认逐行识别，推理内存占用明显更小
+        if rec_batch_num is None and not use_gpu:
+            rec_batch_num = 1
+        if rec_batch_num is not None:
+            ocr_params['text_recognition_batch_size'] = rec_batch_num
+        
         # 合并用户自定义的参数（只添加 PaddleOCR 支持的参数）
         # 过滤掉我们自定义的参数，避免传递给 PaddleOCR
         filtered_kwargs = {
@@ -97,8 +799,79 @@ class ImageOCRReader(BaseReader):
         }
         ocr_params.update(filtered_kwargs)
         
-        # 创建 PaddleOCR 实例
-        self.ocr_model = PaddleOCR(**ocr_params)
+        if use_gpu:
+            # cuDNN 卷积算法搜索参数是进程级设置，需要在创建预测器之前设置
+            _set_cudnn_flags(cudnn_exhaustive_search, conv_workspace_size_limit)
+            
+            # ONNX Runtime 后端不读取 Paddle 的 flag，通过 engine_config 设置 CUDA 执行器
+            # （用户自己传入 engine_config 时不覆盖）
+            if ocr_params.get('engine') == 'onnxruntime' and 'engine_config' not in ocr_params:
+                ocr_params['engine_config'] = {
+                    'execution_mode': 'parallel',
+                    'provider_options': {
+                        'cudnn_conv_algo_search':
+                            'EXHAUSTIVE' if cudnn_exhaustive_search else 'HEURISTIC',
+                    },
+                }
+        
+        # 获取 PaddleOCR 实例（参数相同的 Reader 共用同一个已加载的模型）
+        # 共用的实例不是线程安全的，所有 ocr() 调用都通过 _run_ocr 持有同一把锁
+        frozen_params = _freeze(ocr_params)
+        if _is_hashable(frozen_params):
+            self.ocr_model, self._ocr_lock = _get_paddle_ocr(frozen_params)
+        else:
+            # 参数中有集合、numpy 数组等不可哈希的值，无法查缓存，单独创建实例
+            print("⚠️ PaddleOCR 参数中包含不可哈希的值，不共用缓存的模型")
+            self.ocr_model, self._ocr_lock = _create_paddle_ocr(ocr_params)
+        
+        # GPU 上首次推理需要初始化 CUDA 上下文和选择卷积算法，先用空白图像预热
+        # 第一次推理完成算法搜索，第二次确认之后的推理不再有额外开销
+        if use_gpu and self.ocr_model not in _warmed_up_models:
+            warmup_batch = [np.zeros((64, 64, 3), dtype=np.uint8)] * self.batch_size
+            for _ in range(2):
+                self._run_ocr(warmup_batch)
+            _warmed_up_models.add(self.ocr_model)
+    
+    @staticmethod
+    def clear_model_cache() -> None:
+        """清空共享的 PaddleOCR 实例缓存，并关闭各 Reader 的工作进程池，释放模型占用的内存"""
+        _get_paddle_ocr.cache_clear()
+        for reader in list(_pooled_readers):
+            reader.close()
+    
+    def close(self) -> None:
+        """关闭多进程 OCR 的工作进程池（之后再次多进程识别时会重新创建）"""
+        with self._process_pool_lock:
+            pool, self._process_pool = self._process_pool, None
+        _pooled_readers.discard(self)
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+    
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        """
+        返回 Reader 的工作进程池，第一次调用时创建
+        
+        每个工作进程启动时都要导入 paddle 并加载检测/识别模型，耗时数秒；
+        进程池保留在 Reader 上，多次 load_data 调用复用已加载模型的进程。
+        """
+        with self._process_pool_lock:
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self.num_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker_reader,
+                    # 缓存由主进程统一读写
+                    initargs=({**self._worker_kwargs, 'num_workers': 1, 'cache_dir': None},),
+                )
+                # Reader 被回收时关闭进程池（回调不能引用 Reader 本身）
+                weakref.finalize(self, self._process_pool.shutdown, wait=False, cancel_futures=True)
+                _pooled_readers.add(self)
+            return self._process_pool
+    
+    def _run_ocr(self, images: list) -> list:
+        """持有模型锁调用 ocr()，保证共用同一实例的 Reader 和线程不会同时推理"""
+        with self._ocr_lock:
+            return self.ocr_model.ocr(images)
         
     def load_data(
         self,
@@ -141,53 +914,449 @@ class ImageOCRReader(BaseReader):
             >>> # 带额外元数据
             >>> docs = reader.load_data("image.png", extra_info={"source": "scanner"})
         """
+        return list(self.iter_load_data(file, extra_info))
+    
+    def iter_load_data(
+        self,
+        file: Union[str, Path, List[Union[str, Path]]],
+        extra_info: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Document]:
+        """
+        逐个生成 Document，不在内存中保留全部结果
+        
+        参数和 load_data 相同。文件在调用时立即验证；之后每识别完一批图像就
+        生成对应的 Document，调用方可以边识别边处理（例如逐个插入索引），
+        处理完的 Document 可以及时释放。
+        
+        Args:
+            file (Union[str, Path, List[Union[str, Path]]]): 图像文件路径或路径列表
+            extra_info (Optional[Dict[str, Any]]): 额外元数据
+        
+        Returns:
+            Iterator[Document]: 按输入顺序生成的 Document
+        
+        Example:
+            >>> for doc in reader.iter_load_data(image_files):
+            ...     index.insert(doc)
+        """
+        # 先验证所有文件，避免处理到一半才发现无效文件
+        file_paths = self._validate_files(file)
+        
+        if self.cache_dir is None:
+            return self._iter_ocr_files(file_paths, extra_info)
+        return self._iter_cached(file_paths, extra_info)
+    
+    def _iter_cached(
+        self,
+        file_paths: List[Path],
+        extra_info: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Document]:
+        """有缓存的图像直接读取，只识别缓存未命中的图像，按输入顺序生成 Document"""
+        documents, missing = self._read_cache(file_paths)
+        new_documents = self._iter_ocr_files([file_paths[i] for i in missing])
+        for file_path, document in zip(file_paths, documents):
+            if document is None:
+                # 未命中的图像按原顺序识别，依次取出即可
+                document = next(new_documents)
+                self._write_cache([file_path], [document])
+            yield from self._apply_extra_info([document], extra_info)
+    
+    def _iter_ocr_files(
+        self,
+        file_paths: List[Path],
+        extra_info: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Document]:
+        """对已验证的文件执行 OCR（根据配置选择多进程、流水线或逐批处理）"""
+        # CPU 多进程：文件分给多个进程并行识别
+        if self.num_workers > 1 and len(file_paths) > 1:
+            yield from self._iter_multiprocess_load(file_paths, extra_info)
+            return
+        
+        # 文件较多时，读图、OCR、结果处理三个阶段重叠执行
+        if len(file_paths) > self.pipeline_threshold:
+            yield from self._iter_pipelined_load(file_paths, extra_info)
+            return
+        
+        # 按 batch_size 分批识别
+        for start in range(0, len(file_paths), self.batch_size):
+            batch = file_paths[start:start + self.batch_size]
+            
+            # 执行 OCR 识别
+            # PaddleOCR 的 ocr() 接受路径列表，一次调用处理整批图像，每张图像返回一个结果
+            if self.use_gpu or self.preprocess:
+                results = self._run_ocr(self._prepare_batch(batch))
+            else:
+                results = self._run_ocr([str(p) for p in batch])
+            
+            for file_path, result in zip(batch, results):
+                yield self._build_document(result, file_path, extra_info)
+    
+    async def aload_data(
+        self,
+        file: Union[str, Path, List[Union[str, Path]]],
+        extra_info: Optional[Dict[str, Any]] = None
+    ) -> List[Document]:
+        """
+        load_data 的异步版本
+        
+        读图和 OCR 都放到线程中执行，不阻塞事件循环。下一批图像的读取
+        与当前批次的 OCR 同时进行；同一时间最多有两个批次的图像驻留内存，
+        OCR 调用按顺序逐批执行（共用的 PaddleOCR 实例不是线程安全的）。
+        
+        Args:
+            file (Union[str, Path, List[Union[str, Path]]]): 图像文件路径或路径列表
+            extra_info (Optional[Dict[str, Any]]): 额外元数据
+        
+        Returns:
+            List[Document]: Document 对象列表，顺序与输入一致
+        
+        Example:
+            >>> docs = await reader.aload_data(["img1.png", "img2.jpg"])
+        """
+        file_paths = self._validate_files(file)
+        
+        if self.cache_dir is None:
+            return await self._aocr_files(file_paths, extra_info)
+        
+        documents, missing = await asyncio.to_thread(self._read_cache, file_paths)
+        if missing:
+            new_documents = await self._aocr_files([file_paths[i] for i in missing])
+            for i, document in zip(missing, new_documents):
+                documents[i] = document
+            await asyncio.to_thread(
+                self._write_cache, [file_paths[i] for i in missing], new_documents
+            )
+        return self._apply_extra_info(documents, extra_info)
+    
+    async def _aocr_files(
+        self,
+        file_paths: List[Path],
+        extra_info: Optional[Dict[str, Any]] = None
+    ) -> List[Document]:
+        """_iter_ocr_files 的异步版本"""
+        # 多进程模式下由进程池并行，这里只需要不阻塞事件循环
+        if self.num_workers > 1 and len(file_paths) > 1:
+            return await asyncio.to_thread(
+                lambda: list(self._iter_multiprocess_load(file_paths, extra_info))
+            )
+        
+        # 最多两批同时在途：一批推理时另一批读图，推理本身由 _run_ocr 中的模型锁串行化
+        in_flight = asyncio.Semaphore(2)
+        
+        async def process_batch(batch: List[Path]) -> List[Document]:
+            async with in_flight:
+                images = await asyncio.to_thread(self._prepare_batch, batch)
+                results = await asyncio.to_thread(self._run_ocr, images)
+                return [
+                    self._build_document(result, file_path, extra_info)
+                    for file_path, result in zip(batch, results)
+                ]
+        
+        batches = await asyncio.gather(*(
+            process_batch(file_paths[start:start + self.batch_size])
+            for start in range(0, len(file_paths), self.batch_size)
+        ))
+        return [document for batch_docs in batches for document in batch_docs]
+    
+    def _cache_path(self, file_path: Path) -> Path:
+        """
+        图像对应的缓存文件路径
+        
+        文件名由图像绝对路径的哈希、修改时间（纳秒）、OCR 版本和参数标签组成，
+        图像被修改后 mtime 变化，自然对应新的缓存文件。
+        """
+        abs_path = os.path.abspath(file_path)
+        path_hash = hashlib.sha1(abs_path.encode('utf-8')).hexdigest()
+        mtime_ns = os.stat(abs_path).st_mtime_ns
+        return self.cache_dir / f"{path_hash}_{mtime_ns}_{self.ocr_version}_{self._cache_tag}.json"
+    
+    def _read_cache(
+        self,
+        file_paths: List[Path]
+    ) -> tuple[List[Optional[Document]], List[int]]:
+        """
+        读取缓存的 Document
+        
+        Returns:
+            tuple: (Document 列表，未命中的位置为 None；未命中的下标列表)
+        """
+        documents: List[Optional[Document]] = []
+        missing = []
+        for i, file_path in enumerate(file_paths):
+            document = None
+            cache_path = self._cache_path(file_path)
+            if cache_path.exists():
+                try:
+                    document = Document.from_json(cache_path.read_text(encoding='utf-8'))
+                except (OSError, ValueError) as e:
+                    print(f"⚠️ 缓存文件损坏，重新识别: {cache_path.name} ({e})")
+            if document is None:
+                missing.append(i)
+            documents.append(document)
+        return documents, missing
+    
+    def _write_cache(
+        self,
+        file_paths: List[Path],
+        documents: List[Document]
+    ) -> None:
+        """把新识别的 Document 写入缓存（先写临时文件再替换，避免留下半个文件）"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        for file_path, document in zip(file_paths, documents):
+            cache_path = self._cache_path(file_path)
+            tmp_path = cache_path.with_suffix('.tmp')
+            tmp_path.write_text(document.to_json(), encoding='utf-8')
+            os.replace(tmp_path, cache_path)
+    
+    @staticmethod
+    def _apply_extra_info(
+        documents: List[Document],
+        extra_info: Optional[Dict[str, Any]]
+    ) -> List[Document]:
+        """合并额外元数据（缓存中的 Document 不包含 extra_info，读取后再合并）"""
+        if extra_info:
+            for document in documents:
+                document.metadata.update(extra_info)
+        return documents
+    
+    def _validate_files(
+        self,
+        file: Union[str, Path, List[Union[str, Path]]]
+    ) -> List[Path]:
+        """
+        统一输入格式并验证文件
+        
+        Args:
+            file (Union[str, Path, List[Union[str, Path]]]): 图像文件路径或路径列表
+        
+        Returns:
+            List[Path]: 验证通过的文件路径
+        
+        Raises:
+            FileNotFoundError: 当指定的图像文件不存在时
+            ValueError: 当文件格式不支持时
+        """
         # 统一处理输入：将单个路径转换为列表
         if isinstance(file, (str, Path)):
             files = [file]
         else:
             files = file
         
-        # 存储所有 Document 对象
-        documents = []
-        
-        # 遍历每个图像文件
+        file_paths = []
         for file_path in files:
-            # 转换为 Path 对象，方便路径操作
-            file_path = Path(file_path)
+            path_str = os.fspath(file_path)
             
             # 验证文件是否存在
-            if not file_path.exists():
-                raise FileNotFoundError(f"图像文件不存在: {file_path}")
+            if not os.path.exists(path_str):
+                raise FileNotFoundError(f"图像文件不存在: {path_str}")
             
             # 验证文件格式（支持常见图像格式）
-            supported_formats = {'.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.tif', '.webp'}
-            if file_path.suffix.lower() not in supported_formats:
+            ext = _file_ext(path_str)
+            if ext not in _SUPPORTED_EXTS:
                 raise ValueError(
-                    f"不支持的文件格式: {file_path.suffix}. "
-                    f"支持的格式: {', '.join(supported_formats)}"
+                    f"不支持的文件格式: {'.' + ext if ext else ext}. "
+                    f"支持的格式: {', '.join('.' + e for e in sorted(_SUPPORTED_EXTS))}"
                 )
             
-            # 执行 OCR 识别
-            # PaddleOCR 使用 ocr() 方法进行识别，返回包含检测框和识别结果的列表
-            result = self.ocr_model.ocr(str(file_path))
-            
-            # 提取文本内容和元数据
-            text_content, metadata = self._process_ocr_result(
-                result, 
-                file_path,
-                extra_info
-            )
-            
-            # 创建 Document 对象
-            # Document 是 LlamaIndex 的核心数据结构，包含文本和元数据
-            document = Document(
-                text=text_content,
-                metadata=metadata
-            )
-            
-            documents.append(document)
+            # 验证通过后再转换为 Path 对象，方便后续路径操作
+            file_paths.append(Path(path_str))
         
-        return documents
+        return file_paths
+    
+    def _prepare_batch(self, batch: List[Path]) -> List[np.ndarray]:
+        """读取一批图像，得到可以直接传给 PaddleOCR 的数组列表"""
+        if self.use_gpu:
+            # GPU 上把尺寸相近的图像填充到相同尺寸后一起提交
+            return self._load_and_pad(batch)
+        # 预处理后的数组直接交给 PaddleOCR
+        return [self._load_image(p) for p in batch]
+    
+    def _load_and_pad(self, file_paths: List[Path]) -> List[np.ndarray]:
+        """
+        读取一批图像，并把尺寸相近的图像填充到相同尺寸（GPU 批量推理用，见 _pad_by_size）
+        
+        Args:
+            file_paths (List[Path]): 图像文件路径
+        
+        Returns:
+            List[np.ndarray]: 与 file_paths 顺序一致的 uint8 数组
+        """
+        return _pad_by_size([self._load_image(p) for p in file_paths])
+    
+    def _load_image(self, file_path: Path) -> np.ndarray:
+        """读取单张图像，开启 preprocess 时同时执行预处理"""
+        if self.preprocess:
+            return _preprocess_image(file_path, self.preprocess_ops, self.max_side_len)
+        return _read_image(file_path)
+    
+    def _build_document(
+        self,
+        result: Any,
+        file_path: Path,
+        extra_info: Optional[Dict[str, Any]] = None
+    ) -> Document:
+        """将单张图像的 OCR 结果转换为 Document"""
+        # 提取文本内容和元数据
+        # _process_ocr_result 处理的是单张图像的结果列表
+        text_content, metadata = self._process_ocr_result(
+            [result], 
+            file_path,
+            extra_info
+        )
+        
+        # 创建 Document 对象
+        # Document 是 LlamaIndex 的核心数据结构，包含文本和元数据
+        document = Document(
+            text=text_content,
+            metadata=metadata
+        )
+        
+        # 文本块详细信息和检测框只作为附加数据保存，不参与 Embedding 和 LLM 上下文
+        for key in ('text_blocks_detail', 'bbox_json'):
+            if key in metadata:
+                document.excluded_embed_metadata_keys.append(key)
+                document.excluded_llm_metadata_keys.append(key)
+        
+        return document
+    
+    def _iter_multiprocess_load(
+        self,
+        file_paths: List[Path],
+        extra_info: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Document]:
+        """
+        把文件按顺序分成 num_workers 份，交给进程池并行识别
+        
+        每个进程在初始化时创建自己的 PaddleOCR 实例，之后对分到的文件
+        执行普通的 load_data。使用 spawn 启动进程，避免 fork 继承主进程
+        已加载的模型和推理线程。进程池在多次调用之间复用（见 _get_process_pool）。
+        
+        Args:
+            file_paths (List[Path]): 已验证的图像文件路径
+            extra_info (Optional[Dict[str, Any]]): 额外元数据
+        
+        Returns:
+            Iterator[Document]: 与 file_paths 顺序一致的 Document，每个进程完成后生成其结果
+        """
+        num_workers = min(self.num_workers, len(file_paths))
+        chunk_size = -(-len(file_paths) // num_workers)
+        chunks = [
+            file_paths[start:start + chunk_size]
+            for start in range(0, len(file_paths), chunk_size)
+        ]
+        
+        executor = self._get_process_pool()
+        futures = [
+            executor.submit(_worker_process_chunk, chunk, extra_info)
+            for chunk in chunks
+        ]
+        try:
+            for future in futures:
+                yield from future.result()
+        finally:
+            # 调用方提前停止迭代时，取消还未开始的任务
+            for future in futures:
+                future.cancel()
+    
+    def _iter_pipelined_load(
+        self,
+        file_paths: List[Path],
+        extra_info: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Document]:
+        """
+        以三阶段流水线处理大量图像
+        
+        - 阶段 A（读图线程）：cv2 解码图像（解码时释放 GIL），放入输入队列
+        - 阶段 B（OCR 线程）：从输入队列凑批，凑满 batch_size 或等待超过
+          max_wait_ms 后调用 PaddleOCR，结果放入输出队列
+        - 阶段 C（当前线程）：解析 OCR 结果，逐个生成 Document
+        
+        模型推理期间，下一批图像的读取和上一批结果的处理同时进行。
+        队列中的 None 表示上游阶段结束；OCR 只在一个线程中执行，结果顺序与输入一致。
+        输出队列有上限：调用方处理 Document 较慢（例如插入索引时调用 Embedding）时，
+        OCR 线程最多领先两个批次。调用方提前停止迭代时，读图和 OCR 线程随之退出。
+        
+        Args:
+            file_paths (List[Path]): 已验证的图像文件路径
+            extra_info (Optional[Dict[str, Any]]): 额外元数据
+        
+        Returns:
+            Iterator[Document]: 与 file_paths 顺序一致的 Document
+        """
+        q_in: queue.Queue = queue.Queue(maxsize=self.batch_size * 2)
+        q_out: queue.Queue = queue.Queue(maxsize=2)
+        stop = threading.Event()
+        max_wait = self.max_wait_ms / 1000
+        
+        def put(q: queue.Queue, item: Any) -> None:
+            """放入队列，下游已停止时放弃，避免阻塞在满队列上"""
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+        
+        def get(q: queue.Queue) -> Any:
+            """从队列取出一项，下游已停止时返回 None"""
+            while not stop.is_set():
+                try:
+                    return q.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+            return None
+        
+        def read_images() -> None:
+            try:
+                for file_path in file_paths:
+                    if stop.is_set():
+                        return
+                    put(q_in, (file_path, self._load_image(file_path)))
+            finally:
+                put(q_in, None)
+        
+        def run_ocr() -> None:
+            try:
+                finished = False
+                while not finished:
+                    item = get(q_in)
+                    if item is None:
+                        break
+                    batch = [item]
+                    # 动态凑批：凑满 batch_size 或超过 max_wait_ms 就开始推理
+                    deadline = time.monotonic() + max_wait
+                    while len(batch) < self.batch_size:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        try:
+                            item = q_in.get(timeout=remaining)
+                        except queue.Empty:
+                            break
+                        if item is None:
+                            finished = True
+                            break
+                        batch.append(item)
+                    
+                    images = [image for _, image in batch]
+                    if self.use_gpu:
+                        images = _pad_by_size(images)
+                    results = self._run_ocr(images)
+                    put(q_out, [(file_path, result) for (file_path, _), result in zip(batch, results)])
+            finally:
+                put(q_out, None)
+        
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="ocr-pipeline") as executor:
+            futures = [executor.submit(read_images), executor.submit(run_ocr)]
+            try:
+                while (batch_results := q_out.get()) is not None:
+                    for file_path, result in batch_results:
+                        yield self._build_document(result, file_path, extra_info)
+            finally:
+                stop.set()
+            # 重新抛出读图或 OCR 线程中的异常
+            for future in futures:
+                future.result()
     
     def _process_ocr_result(
         self,
@@ -204,6 +1373,8 @@ class ImageOCRReader(BaseReader):
         - 识别置信度
         
         这个方法负责解析这些信息，并格式化为易于使用的形式。
+        文本块以列式数组保存（文本列表 + 置信度数组 + 检测框数组），
+        只有 return_details=True 时才逐块构造详细信息字典。
         
         Args:
             ocr_result: PaddleOCR 的识别结果对象
@@ -215,12 +1386,16 @@ class ImageOCRReader(BaseReader):
                 - str: 格式化后的文本内容
                 - dict: 包含详细元数据的字典
         """
-        # 存储所有识别出的文本块
-        text_blocks = []
-        # 存储每个文本块的置信度
-        confidences = []
-        # 存储文本块的详细信息（位置、内容、置信度）
-        detailed_blocks = []
+        # 识别出的文本块
+        text_blocks: List[str] = []
+        # 每个文本块的置信度
+        confidences = np.empty(0, dtype=np.float64)
+        # 文本块的检测框，形状为 (N, 4, 2)；没有位置信息时为 None
+        bboxes: Optional[np.ndarray] = None
+        # 文本块在原始结果中的序号
+        block_indices = np.empty(0, dtype=np.int64)
+        # 只有返回详细信息或检测框时才需要转换检测框
+        need_geometry = self.return_details or self.include_bbox
         
         # 遍历 OCR 结果
         # PaddleOCR 的返回格式可能因版本而异
@@ -237,95 +1412,112 @@ class ImageOCRReader(BaseReader):
                 # 提取文本和相关信息
                 # 常见的键: 'dt_polys', 'rec_texts', 'rec_scores'
                 if 'rec_texts' in result_item:
-                    rec_texts = result_item.get('rec_texts', [])
-                    rec_scores = result_item.get('rec_scores', [])
+                    text_blocks = list(map(_intern, result_item.get('rec_texts', [])))
+                    rec_scores = np.asarray(result_item.get('rec_scores', []), dtype=np.float64).ravel()
                     dt_polys = result_item.get('dt_polys', [])
+                    num_blocks = len(text_blocks)
+                    
+                    # 缺少分数的文本块置信度按 1.0 处理
+                    confidences = np.ones(num_blocks, dtype=np.float64)
+                    num_scores = min(num_blocks, rec_scores.size)
+                    confidences[:num_scores] = rec_scores[:num_scores]
+                    block_indices = np.arange(num_blocks)
                     
-                    for idx, text in enumerate(rec_texts):
-                        confidence = rec_scores[idx] if idx < len(rec_scores) else 1.0
-                        bbox = dt_polys[idx] if idx < len(dt_polys) else None
-                        
-                        text_blocks.append(text)
-                        confidences.append(float(confidence))
-                        detailed_blocks.append({
-                            'text': text,
-                            'confidence': float(confidence),
-                            'bbox': bbox.tolist() if hasattr(bbox, 'tolist') else bbox,
-                            'block_index': idx
-                        })
+                    # dt_polys 通常是 N 个 4 点多边形，直接整体转换为 float32 数组
+                    if need_geometry and num_blocks and len(dt_polys) >= num_blocks:
+                        bboxes = _to_polys(dt_polys[:num_blocks])
                 else:
                     print(f"警告: OCRResult 中未找到 'rec_texts' 键")
             
             # 旧版本格式: 直接返回字符串列表
             elif isinstance(result_item, str):
-                for idx, text in enumerate(ocr_result):
-                    if text:
-                        text_blocks.append(text)
-                        confidences.append(1.0)
-                        detailed_blocks.append({
-                            'text': text,
-                            'confidence': 1.0,
-                            'bbox': None,
-                            'block_index': idx
-                        })
+                indices = [idx for idx, text in enumerate(ocr_result) if text]
+                text_blocks = [_intern(ocr_result[idx]) for idx in indices]
+                confidences = np.ones(len(text_blocks), dtype=np.float64)
+                block_indices = np.asarray(indices, dtype=np.int64)
             
             # 旧版本格式: 嵌套列表
             elif isinstance(result_item, list):
+                scores = []
+                boxes = []
+                indices = []
                 for idx, line in enumerate(result_item):
                     if line and len(line) >= 2:
-                        box = line[0]
-                        
                         if isinstance(line[1], (list, tuple)) and len(line[1]) >= 2:
-                            text = line[1][0]
-                            confidence = line[1][1]
+                            text_blocks.append(_intern(line[1][0]))
+                            scores.append(line[1][1])
+                            boxes.append(line[0])
+                            indices.append(idx)
                         else:
                             print(f"警告: 第 {idx} 行的格式不符合预期: {line}")
-                            continue
-                        
-                        text_blocks.append(text)
-                        confidences.append(float(confidence))
-                        detailed_blocks.append({
-                            'text': text,
-                            'confidence': float(confidence),
-                            'bbox': box,
-                            'block_index': idx
-                        })
+                
+                confidences = np.asarray(scores, dtype=np.float64)
+                block_indices = np.asarray(indices, dtype=np.int64)
+                if need_geometry and boxes:
+                    bboxes = _to_polys(boxes)
         
         # 格式化文本内容
         # 每个文本块单独一行，并附带置信度信息
         formatted_text = self._format_text_blocks(text_blocks, confidences)
         
-        # 计算平均置信度
-        avg_confidence = (
-            sum(confidences) / len(confidences) if confidences else 0.0
+        # 计算置信度统计，需要详细信息时同时计算检测框的外接矩形和面积
+        # 数值计算集中在 _parse_blocks 中完成（安装 numba 时为 JIT 编译的内核）
+        with_geometry = self.return_details and bboxes is not None
+        stats, rects, areas = _parse_blocks(
+            confidences,
+            np.ascontiguousarray(bboxes) if with_geometry else _EMPTY_POLYS
         )
+        # 三个值一次取整
+        avg_confidence, min_confidence, max_confidence = np.round(stats, 4).tolist()
         
         # 构建元数据字典
         # 注意：为了避免 LlamaIndex 的 metadata 长度限制，我们简化元数据
+        # 与图像无关的字段（模型版本、语言、是否使用 GPU）在 __init__ 中预先构造
         metadata = {
+            **self._base_metadata,
             # 原始图像路径
             'image_path': str(file_path.absolute()),
             # 图像文件名
             'file_name': file_path.name,
-            # 使用的 OCR 模型版本
-            'ocr_model': self.ocr_version,
-            # OCR 语言
-            'language': self.lang,
             # 检测到的文本块数量
             'num_text_blocks': len(text_blocks),
             # 平均识别置信度
-            'avg_confidence': round(avg_confidence, 4),
+            'avg_confidence': avg_confidence,
             # 最低置信度（用于质量评估）
-            'min_confidence': round(min(confidences), 4) if confidences else 0.0,
+            'min_confidence': min_confidence,
             # 最高置信度
-            'max_confidence': round(max(confidences), 4) if confidences else 0.0,
-            # 是否使用了 GPU
-            'used_gpu': self.use_gpu,
-            # 注意：text_blocks_detail 包含大量数据，可能导致 LlamaIndex 元数据过长
-            # 如果需要详细信息，可以单独存储或通过其他方式访问
-            # 'text_blocks_detail': detailed_blocks,  # 默认注释掉
+            'max_confidence': max_confidence,
         }
         
+        # 所有检测框整体序列化为一个 JSON 字符串，不参与 Embedding 和 LLM 上下文
+        if self.include_bbox:
+            metadata['bbox_json'] = _dumps_array(bboxes) if bboxes is not None else '[]'
+        
+        # 文本块详细信息（位置、内容、置信度）数据量大，只在需要时构造
+        # 该字段不参与 Embedding 和 LLM 上下文（见 _build_document）
+        if self.return_details:
+            # 每一列整体调用一次 tolist()，再按行组合，不逐块索引数组、转换标量
+            # 开启 include_bbox 时检测框已保存在 bbox_json 中，不再转换为列表
+            empty_column = [None] * len(text_blocks)
+            bbox_column = bboxes.tolist() if with_geometry and not self.include_bbox else empty_column
+            # 外接矩形 [x_min, y_min, x_max, y_max] 和检测框面积（像素）
+            rect_column = rects.tolist() if with_geometry else empty_column
+            area_column = areas.tolist() if with_geometry else empty_column
+            metadata['text_blocks_detail'] = [
+                {
+                    'text': text,
+                    'confidence': confidence,
+                    'bbox': bbox,
+                    'bbox_rect': rect,
+                    'area': area,
+                    'block_index': block_index
+                }
+                for text, confidence, bbox, rect, area, block_index in zip(
+                    text_blocks, confidences.tolist(), bbox_column,
+                    rect_column, area_column, block_indices.tolist()
+                )
+            ]
+        
         # 合并用户提供的额外元数据
         if extra_info:
             metadata.update(extra_info)
@@ -335,22 +1527,23 @@ class ImageOCRReader(BaseReader):
     def _format_text_blocks(
         self,
         text_blocks: List[str],
-        confidences: List[float]
+        confidences: Sequence[float]
     ) -> str:
         """
         格式化文本块，生成易读的文本内容
         
         将 OCR 识别出的多个文本块组织成结构化的文本，
-        便于后续的检索和理解。
+        便于后续的检索和理解。格式由 include_confidence_prefix 和
+        include_plain_section 控制。
         
         Args:
             text_blocks (List[str]): 识别出的文本块列表
-            confidences (List[float]): 对应的置信度列表
+            confidences (Sequence[float]): 对应的置信度（列表或数组）
         
         Returns:
             str: 格式化后的文本字符串
         
-        格式示例：
+        格式示例（两个选项都开启时）：
             [Block 1] (conf: 0.98): 这是第一行文本
             [Block 2] (conf: 0.95): 这是第二行文本
             
@@ -361,22 +1554,31 @@ class ImageOCRReader(BaseReader):
         if not text_blocks:
             return ""
         
-        # 方式1: 带置信度的详细格式
-        detailed_lines = []
-        for i, (text, conf) in enumerate(zip(text_blocks, confidences), 1):
-            # 格式: [Block N] (conf: 0.XX): 文本内容
-            detailed_lines.append(f"[Block {i}] (conf: {conf:.2f}): {text}")
+        # 两个选项都关闭时就是纯文本
+        if not self.include_confidence_prefix and not self.include_plain_section:
+            return "\n".join(text_blocks)
         
-        detailed_text = "\n".join(detailed_lines)
+        # 各部分依次写入同一个缓冲区，不再先拼出多段文本再合并
+        buf = io.StringIO()
         
-        # 方式2: 纯文本格式（用于简单场景）
-        plain_text = "\n".join(text_blocks)
+        if self.include_confidence_prefix:
+            # 方式1: 带置信度的详细格式
+            # 置信度字符串查表得到，不在循环中逐个格式化浮点数
+            conf_strs = _format_confidences(confidences)
+            for i, (text, conf_str) in enumerate(zip(text_blocks, conf_strs), 1):
+                if i > 1:
+                    buf.write("\n")
+                # 格式: [Block N] (conf: 0.XX): 文本内容
+                buf.write(f"[Block {i}] {conf_str}: {text}")
+        else:
+            buf.write("\n".join(text_blocks))
         
-        # 组合两种格式
-        # 这样既保留了详细信息，又提供了纯文本版本
-        formatted_text = f"{detailed_text}\n\n=== 纯文本内容 ===\n{plain_text}"
+        if self.include_plain_section:
+            # 方式2: 纯文本格式（与详细格式内容重复，默认不输出）
+            buf.write("\n\n=== 纯文本内容 ===\n")
+            buf.write("\n".join(text_blocks))
         
-        return formatted_text
+        return buf.getvalue()
     
     def load_data_from_dir(
         self,
@@ -405,27 +1607,13 @@ class ImageOCRReader(BaseReader):
             >>> # 递归加载所有子目录
             >>> docs = reader.load_data_from_dir("./all_images", recursive=True)
         """
-        dir_path = Path(dir_path)
+        dir_path = os.fspath(dir_path)
         
-        if not dir_path.exists() or not dir_path.is_dir():
+        if not os.path.isdir(dir_path):
             raise ValueError(f"目录不存在或不是有效目录: {dir_path}")
         
-        # 支持的图像格式
-        image_extensions = {'.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.tif', '.webp'}
-        
-        # 查找所有图像文件
-        if recursive:
-            # 递归查找
-            image_files = [
-                f for f in dir_path.rglob('*')
-                if f.suffix.lower() in image_extensions and f.is_file()
-            ]
-        else:
-            # 只查找当前目录
-            image_files = [
-                f for f in dir_path.glob('*')
-                if f.suffix.lower() in image_extensions and f.is_file()
-            ]
+        # 查找所有图像文件（recursive=True 时递归查找子目录）
+        image_files = _scan_images(dir_path, recursive)
         
         if not image_files:
             print(f"警告: 在 {dir_path} 中未找到图像文件")
@@ -435,3 +1623,38 @@ class ImageOCRReader(BaseReader):
         
         # 批量处理
         return self.load_data(image_files, extra_info=extra_info)
+    
+    async def aload_data_from_dir(
+        self,
+        dir_path: Union[str, Path],
+        recursive: bool = False,
+        extra_info: Optional[Dict[str, Any]] = None
+    ) -> List[Document]:
+        """
+        load_data_from_dir 的异步版本，目录扫描和 OCR 都不阻塞事件循环
+        
+        Args:
+            dir_path (Union[str, Path]): 目录路径
+            recursive (bool): 是否递归搜索子目录，默认 False
+            extra_info (Optional[Dict[str, Any]]): 额外元数据
+        
+        Returns:
+            List[Document]: Document 对象列表
+        
+        Example:
+            >>> docs = await reader.aload_data_from_dir("./images", recursive=True)
+        """
+        dir_path = os.fspath(dir_path)
+        
+        if not os.path.isdir(dir_path):
+            raise ValueError(f"目录不存在或不是有效目录: {dir_path}")
+        
+        image_files = await asyncio.to_thread(_scan_images, dir_path, recursive)
+        
+        if not image_files:
+            print(f"警告: 在 {dir_path} 中未找到图像文件")
+            return []
+        
+        print(f"找到 {len(image_files)} 个图像文件，开始处理...")
+        
+        return await self.aload_data(image_files, extra_info=extra_info)
@@ -10,21 +10,23 @@ OCR 图像文本加载器测试脚本
     uv run python -m ocr_research.main
 """
 
+import hashlib
 import os
 from pathlib import Path
 from dotenv import load_dotenv
 
 # 导入 LlamaIndex 核心组件
-from llama_index.core import Settings, VectorStoreIndex
-from llama_index.llms.openai_like import OpenAILike
-from llama_index.embeddings.dashscope import (
-    DashScopeEmbedding,
-    DashScopeTextEmbeddingModels
-)
+# LLM、嵌入模型和索引在用到的函数中再导入，只运行 OCR 演示时不需要加载
+from llama_index.core import Settings
 
 # 导入我们实现的 ImageOCRReader
 from ocr_research.image_ocr_reader import ImageOCRReader
 
+# 缓存目录：OCR 结果和向量索引，再次运行时跳过 OCR 和 Embedding
+CACHE_DIR = Path(__file__).parent / ".cache"
+OCR_CACHE_DIR = CACHE_DIR / "ocr"
+INDEX_CACHE_DIR = CACHE_DIR / "index"
+
 
 def setup_llm():
     """
@@ -43,6 +45,12 @@ def setup_llm():
         print("如需使用 LlamaIndex 查询功能，请设置此环境变量")
         return False
     
+    from llama_index.llms.openai_like import OpenAILike
+    from llama_index.embeddings.dashscope import (
+        DashScopeEmbedding,
+        DashScopeTextEmbeddingModels
+    )
+    
     # 配置大语言模型（用于生成回答）
     Settings.llm = OpenAILike(
         model="qwen-plus",  # 使用通义千问 Plus 模型
@@ -74,7 +82,7 @@ def demo_basic_ocr():
     
     # 创建 ImageOCRReader 实例
     # lang='ch' 表示使用中文模型
-    reader = ImageOCRReader(lang='ch', use_gpu=False)
+    reader = ImageOCRReader(lang='ch', use_gpu=False, cache_dir=OCR_CACHE_DIR)
     
     # 测试图像列表
     test_images = [
@@ -153,7 +161,7 @@ def demo_batch_ocr():
         print(f"  - {img.name}")
     
     # 创建 Reader
-    reader = ImageOCRReader(lang='ch')
+    reader = ImageOCRReader(lang='ch', cache_dir=OCR_CACHE_DIR)
     
     # 批量处理
     print("\n开始批量处理...")
@@ -178,13 +186,14 @@ def demo_llamaindex_integration(documents):
     展示如何将 OCR 提取的文本构建索引，并进行智能检索
     
     Args:
-        documents: ImageOCRReader 生成的 Document 列表
+        documents: ImageOCRReader 生成的 Document 列表，也可以是
+            reader.iter_load_data() 返回的迭代器（边识别边插入索引，不保留全部文档）
     """
     print("\n" + "="*60)
     print("演示 3: LlamaIndex 集成 - 构建索引并查询")
     print("="*60)
     
-    if not documents:
+    if isinstance(documents, list) and not documents:
         print("错误: 没有可用的文档")
         return
     
@@ -201,6 +210,11 @@ def demo_llamaindex_integration(documents):
         
         # 配置更大的 chunk size 以容纳 OCR 元数据
         # OCR 提取的文本通常比较长，需要更大的分块大小
+        from llama_index.core import (
+            StorageContext,
+            VectorStoreIndex,
+            load_index_from_storage,
+        )
         from llama_index.core.node_parser import SentenceSplitter
         
         # 设置文本分割器，增加 chunk_size 以避免元数据长度超限
@@ -209,8 +223,37 @@ def demo_llamaindex_integration(documents):
             chunk_overlap=200  # 保持合理的重叠
         )
         
-        index = VectorStoreIndex.from_documents(documents)
-        print("✓ 索引构建完成")
+        # 索引按文档内容的哈希缓存：文档不变时直接加载，跳过 Embedding 调用
+        # （传入迭代器时无法预先计算哈希，总是重新构建）
+        persist_dir = None
+        if isinstance(documents, list):
+            corpus_hash = hashlib.sha1(
+                "".join(doc.hash for doc in documents).encode("utf-8")
+            ).hexdigest()[:16]
+            persist_dir = INDEX_CACHE_DIR / corpus_hash
+        
+        if persist_dir is not None and persist_dir.exists():
+            storage_context = StorageContext.from_defaults(persist_dir=str(persist_dir))
+            index = load_index_from_storage(storage_context)
+            print(f"✓ 从缓存加载索引: {persist_dir}")
+        else:
+            # 逐个插入文档：每个文档切分、Embedding 后即可释放，
+            # 配合 iter_load_data 时 OCR 和 Embedding 交替进行
+            index = VectorStoreIndex([])
+            hasher = hashlib.sha1()
+            num_documents = 0
+            for doc in documents:
+                index.insert(doc)
+                hasher.update(doc.hash.encode("utf-8"))
+                num_documents += 1
+            
+            if num_documents == 0:
+                print("错误: 没有可用的文档")
+                return
+            
+            persist_dir = INDEX_CACHE_DIR / hasher.hexdigest()[:16]
+            index.storage_context.persist(persist_dir=str(persist_dir))
+            print(f"✓ 索引构建完成（{num_documents} 个文档）")
         
         # 如果 LLM 已配置，进行查询演示
         if llm_configured:
@@ -273,7 +316,7 @@ def demo_directory_loading():
     current_dir = Path(__file__).parent
     
     # 创建 Reader
-    reader = ImageOCRReader(lang='ch')
+    reader = ImageOCRReader(lang='ch', cache_dir=OCR_CACHE_DIR)
     
     try:
         # 从当前目录加载所有图像
@@ -323,6 +366,10 @@ def main():
     if documents:
         demo_llamaindex_integration(documents)
     
+    # 图像较多时可以边识别边建索引，不在内存中保留全部文档：
+    # reader = ImageOCRReader(lang='ch', cache_dir=OCR_CACHE_DIR)
+    # demo_llamaindex_integration(reader.iter_load_data(image_files))
+    
     # 演示 4: 目录加载
     # dir_documents = demo_directory_loading()
     